@@ -1,105 +1,444 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from utils.config import Config
+from utils.logging_setup import get_logger
+from core.disk_cache import DiskLRUCache
+from core.llm_client import llm_deadline, CHARS_PER_TOKEN
 from .criteria_matcher import CriteriaMatcher
 from .resume_parser import ResumeParser
 from .skill_analyzer import SkillAnalyzer
 from .recommender import Recommender
+from .stage_scheduler import StageScheduler
+from .job_profile import get_job_profile
+from .section_segmenter import segment_resume
+from .prompt_layout import SHARED_PREFIX
+logger = get_logger(__name__)
 
 class ResumeBatch:
     """Handle batch processing of multiple resumes"""
     
-    def __init__(self, pdf_processor, llm_client, json_handler):
+    # Resume sections each LLM stage needs; criteria always see the full text
+    STAGE_SECTIONS = {
+        "summary": ("header", "contact", "summary", "experience", "education", "skills"),
+        "skill_match": ("summary", "skills", "experience", "projects"),
+        "recommendation": ("summary", "experience", "education", "skills", "projects")
+    }
+    # Resumes scored together by the cascade pre-rank
+    PRE_RANK_SLICE = 64
+    
+    def __init__(self, pdf_processor, llm_client, json_handler, checkpoint_store=None):
         self.pdf_processor = pdf_processor
         self.llm_client = llm_client
         self.json_handler = json_handler
         self.resume_parser = ResumeParser(llm_client, json_handler)
-        self.criteria_matcher = CriteriaMatcher(llm_client)
+        self.criteria_matcher = CriteriaMatcher(llm_client, json_handler)
         self.skill_analyzer = SkillAnalyzer(llm_client, json_handler)
         self.recommender = Recommender(llm_client, json_handler)
         self.results = []
+        # Completed stages survive crashes and restarts; pass False to disable
+        if checkpoint_store is None and Config.CHECKPOINT_ENABLED:
+            checkpoint_store = DiskLRUCache.shared(
+                Config.CHECKPOINT_PATH,
+                max_bytes=Config.CHECKPOINT_MAX_MB * 1024 * 1024,
+                ttl=Config.CHECKPOINT_TTL
+            )
+        self.checkpoint_store = checkpoint_store or None
         
-    async def process_resumes(self, files, criteria_items, job_description=""):
-        """Process multiple resumes with comprehensive analysis"""
-        from datetime import datetime
-        import asyncio
-        import os
-        from utils.logging_setup import logger
-        from langdetect import detect
+    async def process_resumes(self, files, criteria_items, job_description="", max_concurrency=None, resume_timeout=None,
+                              progress_callback=None, top_k=None, min_score=None, batch_timeout=None):
+        """Process multiple resumes with comprehensive analysis
+        
+        Collects everything ``iter_results`` yields into the display summary
+        and the list of detailed results, in the order of ``files``.
+        ``progress_callback(done, total)`` is called after each resume.
+        """
+        records = {}
+        async for record in self.iter_results(files, criteria_items, job_description, max_concurrency, resume_timeout,
+                                              top_k=top_k, min_score=min_score, batch_timeout=batch_timeout):
+            # Only the small result dicts are kept, never the resume text
+            records[record["index"]] = record
+            if progress_callback:
+                progress_callback(record["done"], record["total"] or len(records))
+                
+        ordered = [records[index] for index in sorted(records)]
+        all_candidates = [(record["has_match"], record["candidate_entry"]) for record in ordered]
+        detailed_results = [record["result"] for record in ordered if record["result"] is not None]
+            
+        # Sort candidates to show matches first
+        sorted_candidates = sorted(all_candidates, key=lambda x: x[0], reverse=True)
+        summary = "\n".join(candidate[1] for candidate in sorted_candidates)
+        
+        self.results = detailed_results
+        logger.info(f"Batch processing complete: {len(detailed_results)} resumes analyzed")
+        return summary, detailed_results
         
-        logger.info(f"Starting batch processing of {len(files)} resumes")
-        all_candidates = []
-        detailed_results = []
+    async def iter_results(self, files, criteria_items, job_description="", max_concurrency=None, resume_timeout=None,
+                           top_k=None, min_score=None, batch_timeout=None):
+        """Yield one record per resume as soon as its analysis completes
         
-        for file in files:
-            # Get filename
-            filename = os.path.basename(file.name)
-            logger.info(f"Processing resume: {filename}")
+        Up to ``max_concurrency`` resumes move through the pipeline at once
+        (defaults to ``Config.MAX_CONCURRENT_RESUMES``; use 1 for strictly
+        sequential processing). Each resume gets ``resume_timeout`` seconds
+        before it is reported as an error, so one stalled resume cannot hold
+        up the batch. Records are dicts with ``index`` (position in
+        ``files``), ``filename``, ``has_match``, ``candidate_entry``,
+        ``result`` (the detailed result, None on error), ``done`` and
+        ``total`` (None when ``files`` has no length).
+        
+        ``files`` may be any iterable, e.g. a generator over a directory.
+        Files are extracted only a little ahead of the pipelines and nothing
+        is kept once its record has been yielded, so memory stays bounded
+        by the concurrency rather than the batch size.
+        
+        Cascade mode (``top_k`` / ``min_score``, defaulting to
+        ``Config.CASCADE_TOP_K`` / ``Config.CASCADE_MIN_SCORE``) first ranks
+        every resume with a local score and only sends the best ``top_k``,
+        plus any scoring at least ``min_score``, to the LLM for skill match
+        and recommendation; the rest get keyword-based results. It needs a
+        job description and reads ``files`` twice.
+        
+        After ``batch_timeout`` seconds (default ``Config.BATCH_TIMEOUT``, 0
+        for none) LLM calls give up and every remaining stage uses its local
+        fallback, so the batch still finishes with a result per resume.
+        """
+        max_concurrency = max(1, max_concurrency or Config.MAX_CONCURRENT_RESUMES)
+        if resume_timeout is None:
+            resume_timeout = Config.RESUME_TIMEOUT
+        top_k = Config.CASCADE_TOP_K if top_k is None else top_k
+        min_score = Config.CASCADE_MIN_SCORE if min_score is None else min_score
+        if batch_timeout is None:
+            batch_timeout = Config.BATCH_TIMEOUT
+        batch_deadline = time.monotonic() + batch_timeout if batch_timeout else None
+        # Job description work is shared by every resume in the batch
+        job_profile = get_job_profile(job_description)
+        
+        deep = None
+        if job_profile and (top_k or min_score):
+            if not isinstance(files, (list, tuple)):
+                files = list(files)
+            deep = await self._select_for_deep_analysis(files, criteria_items, job_profile, top_k, min_score)
+        total = len(files) if hasattr(files, "__len__") else None
             
-            # Extract text from PDF
-            resume_text = self.pdf_processor.extract_text(file)
-            if not resume_text:
-                logger.warning(f"No text extracted from {filename}")
-                all_candidates.append((False, f"🧑 {filename}\n❌ Error: No text extracted\n---"))
-                continue
-                
-            # Detect language
+        logger.info(f"Starting batch processing of {total if total is not None else 'streamed'} resumes ({max_concurrency} in flight)")
+        
+        async def run(item):
+            file = item["file"]
+            filename = os.path.basename(file.name)
+            if item["error"]:
+                logger.warning(f"Text extraction failed for {filename}: {item['error']}")
+            # Set inside the task, so the deadline covers its stages only
+            deadline = (
+                llm_deadline(batch_deadline - time.monotonic()) if batch_deadline else contextlib.nullcontext()
+            )
             try:
-                lang = detect(resume_text[:500])
-                logger.debug(f"Detected language: {lang}")
-            except:
-                logger.warning("Language detection failed, defaulting to English")
-                lang = 'en'
-                
-            # Process criteria
-            logger.info(f"Evaluating {len(criteria_items)} criteria")
-            results = await self.criteria_matcher.analyze_criteria_batch(resume_text, criteria_items, lang)
+                with deadline:
+                    outcome = await asyncio.wait_for(
+                        self._process_single_resume(
+                            file, criteria_items, job_description, item["text"], job_profile,
+                            deep=deep is None or item["index"] in deep
+                        ),
+                        timeout=resume_timeout or None
+                    )
+            except asyncio.TimeoutError:
+                logger.error(f"Processing timed out after {resume_timeout}s: {filename}")
+                outcome = (False, f"🧑 {filename}\n❌ Error: Processing timed out\n---"), None
+            except Exception as e:
+                logger.error(f"Error processing resume {filename}: {str(e)}")
+                outcome = (False, f"🧑 {filename}\n❌ Error: {str(e)}\n---"), None
+            return item["index"], filename, outcome
+            
+        # PDFs are parsed across the process pool in completion order; a
+        # pipeline starts as soon as a text is ready and a slot is free
+        extraction = self.pdf_processor.extract_texts_async(files, max_buffered=max_concurrency)
+        running = set()
+        done = 0
+        
+        def to_record(task):
+            index, filename, ((has_match, candidate_entry), result) = task.result()
+            return {
+                "index": index,
+                "filename": filename,
+                "has_match": has_match,
+                "candidate_entry": candidate_entry,
+                "result": result,
+                "done": done,
+                "total": total
+            }
+            
+        try:
+            async for item in extraction:
+                running.add(asyncio.ensure_future(run(item)))
+                while len(running) >= max_concurrency:
+                    finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for task in finished:
+                        done += 1
+                        yield to_record(task)
+            while running:
+                finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    done += 1
+                    yield to_record(task)
+        finally:
+            # Also reached when the consumer stops early
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            await extraction.aclose()
+        
+    async def _process_single_resume(self, file, criteria_items, job_description, resume_text=None, job_profile=None,
+                                     deep=True):
+        """Run the full analysis pipeline for one resume
+        
+        ``resume_text`` is the already extracted text; when omitted the PDF
+        is extracted here.
+        ``job_profile`` is the batch's ``JobProfile`` (looked up from
+        ``job_description`` when omitted). With ``deep=False`` the skill
+        match and recommendation are computed locally instead of by the
+        LLM. Returns a
+        ``((has_match, candidate_entry), detailed_result)`` pair;
+        ``detailed_result`` is None when no text could be extracted.
+        """
+        from langdetect import detect
+        
+        # Get filename
+        filename = os.path.basename(file.name)
+        logger.info(f"Processing resume: {filename}")
+        
+        # Extract text from PDF off the event loop so other resumes keep moving
+        if resume_text is None:
+            resume_text = await asyncio.to_thread(self.pdf_processor.extract_text, file)
+        if not resume_text:
+            logger.warning(f"No text extracted from {filename}")
+            return (False, f"🧑 {filename}\n❌ Error: No text extracted\n---"), None
             
-            # Get resume summary
-            logger.info("Extracting resume summary")
-            resume_summary = await self.resume_parser.extract_resume_summary(resume_text, filename, lang)
+        # Detect language
+        try:
+            lang = detect(resume_text[:500])
+            logger.debug(f"Detected language: {lang}")
+        except:
+            logger.warning("Language detection failed, defaulting to English")
+            lang = 'en'
             
-            # Get skill match if job description provided
-            skill_match = None
-            if job_description.strip():
-                logger.info("Analyzing skill match with job description")
-                skill_match = await self.skill_analyzer.get_skill_match(resume_text, job_description, filename, lang)
+        # Each LLM stage only sees the resume sections it needs, unless the
+        # stages share a resume prefix (which must then be identical)
+        trim = Config.SECTION_TRIMMING and Config.PROMPT_LAYOUT != SHARED_PREFIX
+        sections = segment_resume(resume_text) if trim else None
+        stage_texts = {
+            stage: sections.select(labels) if sections else resume_text
+            for stage, labels in self.STAGE_SECTIONS.items()
+        }
+        
+        # Only the recommendation depends on another stage (the criteria
+        # results), so everything else runs concurrently
+        job_profile = job_profile or get_job_profile(job_description)
+        has_job_description = bool(job_profile)
+        scheduler = StageScheduler()
+        scheduler.add_stage(
+            "criteria",
+            lambda: self.criteria_matcher.analyze_criteria_batch(resume_text, criteria_items, lang)
+        )
+        scheduler.add_stage(
+            "summary",
+            lambda: self.resume_parser.extract_resume_summary(stage_texts["summary"], filename, lang)
+        )
+        if has_job_description and not deep:
+            # Below the cascade cut-off: keyword skill match and tiered recommendation
+            async def local_skill_match():
+                return self.skill_analyzer.quick_skill_match(resume_text, job_description, filename, job_profile)
                 
-            # Generate recommendation if job description provided
-            recommendation = None
-            if job_description.strip():
-                logger.info("Generating hiring recommendation")
-                recommendation = await self.recommender.get_recommendation(resume_text, job_description, results, filename, lang)
+            async def local_recommendation(criteria, skill_match):
+                return self.recommender.quick_recommendation(criteria, skill_match, filename)
                 
-            # Format candidate entry for display
-            candidate_entry = self.format_candidate_entry(
-                filename, resume_summary, results, skill_match, recommendation
+            scheduler.add_stage("skill_match", local_skill_match)
+            scheduler.add_stage("recommendation", local_recommendation, depends_on=("criteria", "skill_match"))
+        elif has_job_description:
+            scheduler.add_stage(
+                "skill_match",
+                lambda: self.skill_analyzer.get_skill_match(
+                    stage_texts["skill_match"], job_description, filename, lang, job_profile
+                )
+            )
+            scheduler.add_stage(
+                "recommendation",
+                lambda criteria: self.recommender.get_recommendation(
+                    stage_texts["recommendation"], job_description, criteria, filename, lang, job_profile
+                ),
+                depends_on=("criteria",)
             )
             
-            # Check if any criteria matched
-            has_match = any("✅" in result for result in results)
-            
-            # Add to results
-            all_candidates.append((has_match, candidate_entry))
+        llm_stages = ["summary"] + (["skill_match", "recommendation"] if has_job_description and deep else [])
+        tokens_saved = {
+            stage: max(0, len(resume_text) - len(stage_texts[stage])) // CHARS_PER_TOKEN for stage in llm_stages
+        }
+        if sections is not None:
+            logger.info(
+                f"Sections found in {filename}: {', '.join(sorted(sections.labels))}; "
+                f"~{sum(tokens_saved.values())} prompt tokens saved"
+            )
             
-            detailed_results.append({
-                "filename": filename,
-                "name": resume_summary.get("name", "Unknown"),
-                "basic_info": resume_summary,
-                "criteria_results": results,
-                "skill_match": skill_match,
-                "recommendation": recommendation,
-                "has_match": has_match,
-                "timestamp": datetime.now().isoformat()
-            })
+        self._add_checkpoints(scheduler, resume_text, criteria_items, job_description, filename, deep)
+        logger.info(f"Running {len(scheduler.stages)} analysis stages for {filename}")
+        started = time.perf_counter()
+        stage_results = await scheduler.run()
+        stage_timings = dict(scheduler.timings, total=round(time.perf_counter() - started, 3))
+        
+        results = stage_results["criteria"]
+        resume_summary = stage_results["summary"]
+        skill_match = stage_results.get("skill_match")
+        recommendation = stage_results.get("recommendation")
             
-            logger.info(f"Completed processing resume: {filename}")
+        # Format candidate entry for display
+        candidate_entry = self.format_candidate_entry(
+            filename, resume_summary, results, skill_match, recommendation
+        )
+        
+        # Check if any criteria matched
+        has_match = any("✅" in result for result in results)
+        
+        detailed_result = {
+            "filename": filename,
+            "name": resume_summary.get("name", "Unknown"),
+            "basic_info": resume_summary,
+            "criteria_results": results,
+            "skill_match": skill_match,
+            "recommendation": recommendation,
+            "has_match": has_match,
+            "analysis_depth": "full" if deep else "local",
+            "prompt_tokens_saved": tokens_saved,
+            "stage_timings": stage_timings,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        logger.info(f"Completed processing resume: {filename}")
+        return (has_match, candidate_entry), detailed_result
+        
+    def local_score(self, resume_text, literal_criteria, job_profile, skill_score=None):
+        """Cheap 0-100 relevance score: keyword skill match and verbatim criteria
+        
+        Weighted like ``Recommender.determine_recommendation_tier`` (60%
+        criteria, 40% skills) when there are literal criteria. Pass
+        ``skill_score`` when it is already known, e.g. from
+        ``SkillAnalyzer.score_batch``.
+        """
+        if skill_score is None:
+            skill_score = self.skill_analyzer._extract_skills_manually(
+                resume_text, job_profile.text, job_profile.required_skills
+            )["match_score"]
+        if not literal_criteria:
+            return skill_score
+        verdicts = self.criteria_matcher.match_verbatim(resume_text, literal_criteria)
+        criteria_rate = self.criteria_matcher.get_match_rate(list(verdicts.values()))
+        return criteria_rate * 0.6 + skill_score * 0.4
+        
+    async def _select_for_deep_analysis(self, files, criteria_items, job_profile, top_k, min_score):
+        """Rank every resume by ``local_score`` and pick those worth LLM analysis
+        
+        Returns the positions in ``files`` of the ``top_k`` best resumes and
+        of any resume scoring at least ``min_score``. Texts are scored in
+        slices of ``PRE_RANK_SLICE`` (one ``SkillAnalyzer.score_batch`` call
+        each, off the event loop) and dropped, so memory does not grow with
+        the batch; the second pass reads them again (from the PDF text cache
+        if on).
+        """
+        literal = []
+        for criterion in criteria_items:
+            label, is_semantic = self.criteria_matcher.parse_criterion(criterion)
+            if not is_semantic:
+                literal.append(label)
+                
+        def score_slice(items):
+            skill_scores = self.skill_analyzer.score_batch([text for _, text in items], job_profile.text)
+            return {
+                index: self.local_score(text, literal, job_profile, skill_scores.score(row))
+                for row, (index, text) in enumerate(items)
+            }
             
-        # Sort candidates to show matches first
-        sorted_candidates = sorted(all_candidates, key=lambda x: x[0], reverse=True)
-        summary = "\n".join(candidate[1] for candidate in sorted_candidates)
+        scores = {}
+        pending = []
+        extraction = self.pdf_processor.extract_texts_async(files, max_buffered=self.PRE_RANK_SLICE)
+        async for item in extraction:
+            if item["text"]:
+                pending.append((item["index"], item["text"]))
+            if len(pending) >= self.PRE_RANK_SLICE:
+                scores.update(await asyncio.to_thread(score_slice, pending))
+                pending = []
+        if pending:
+            scores.update(await asyncio.to_thread(score_slice, pending))
+                
+        ranked = sorted(scores, key=lambda index: (-scores[index], index))
+        deep = set(ranked[:top_k]) if top_k else set()
+        if min_score:
+            deep.update(index for index, score in scores.items() if score >= min_score)
+        logger.info(f"Cascade: {len(deep)} of {len(files)} resumes selected for full LLM analysis")
+        return deep
         
-        self.results = detailed_results
-        logger.info(f"Batch processing complete: {len(detailed_results)} resumes analyzed")
-        return summary, detailed_results
+    def _checkpoint_key(self, filename, resume_text, criteria_items, job_description, deep=True):
+        """Identify one resume within one batch configuration
+        
+        A rerun with the same model, criteria, job description, file name,
+        resume text, prompt settings and analysis depth maps to the same
+        key, wherever the file sits in the batch.
+        """
+        fingerprint = json.dumps([
+            filename,
+            getattr(self.llm_client, "model_name", None),
+            Config.CRITERIA_MODE,
+            Config.PROMPT_LAYOUT,
+            Config.SECTION_TRIMMING,
+            Config.LOCAL_CRITERIA_MATCHING,
+            "full" if deep else "local",
+            list(criteria_items),
+            job_description
+        ], ensure_ascii=False)
+        digest = hashlib.sha256(fingerprint.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(resume_text.encode("utf-8", "replace"))
+        return digest.hexdigest()
+        
+    @staticmethod
+    def _is_fallback(result):
+        """Whether a stage result is a degraded or local-only answer that is not worth storing"""
+        if isinstance(result, dict):
+            return bool(result.get("fallback")) or result.get("source") == "local"
+        if isinstance(result, list):
+            return any("(Error:" in item for item in result if isinstance(item, str))
+        return result is None
         
+    def _add_checkpoints(self, scheduler, resume_text, criteria_items, job_description, filename, deep=True):
+        """Wrap each stage so finished results are stored and reused on rerun
+        
+        A stage is restored from the store only if none of its dependencies
+        had to be recomputed; fallback results are never stored, so stages
+        that failed last time are retried.
+        """
+        if self.checkpoint_store is None:
+            return
+        key = self._checkpoint_key(filename, resume_text, criteria_items, job_description, deep)
+        recomputed = set()
+        
+        def wrap(name, func, deps):
+            async def run_stage(**inputs):
+                stage_key = f"{key}:{name}"
+                if not recomputed.intersection(deps):
+                    saved = await asyncio.to_thread(self.checkpoint_store.get, stage_key)
+                    if saved is not None:
+                        logger.debug(f"Restored stage '{name}' for {filename} from checkpoint")
+                        return saved
+                recomputed.add(name)
+                result = await func(**inputs)
+                if not self._is_fallback(result):
+                    await asyncio.to_thread(self.checkpoint_store.set, stage_key, result)
+                return result
+            return run_stage
+            
+        for name, (func, deps) in list(scheduler.stages.items()):
+            scheduler.stages[name] = (wrap(name, func, deps), deps)
+            
     def format_candidate_entry(self, filename, resume_summary, results, skill_match, recommendation):
         """Format candidate entry for display"""
         name = resume_summary.get("name", "Unknown")
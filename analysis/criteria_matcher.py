@@ -1,13 +1,32 @@
 import asyncio
 import re
+from functools import lru_cache
 from utils.logging_setup import get_logger
 logger = get_logger(__name__)
+from utils.config import Config
+from .text_matcher import AhoCorasick, normalize_text
+from .section_segmenter import trim_sections
+from .prompt_layout import build_prompt
+from core.output_schemas import criteria_schema
+from core.llm_client import LLMClient, CHARS_PER_TOKEN
+
+# Criteria starting with one of these need judgement and always go to the LLM
+SEMANTIC_PREFIXES = ("semantic:", "~")
+
+@lru_cache(maxsize=32)
+def build_verbatim_matcher(criteria):
+    """Compile a tuple of literal criteria into one automaton (cached per criteria set)"""
+    return AhoCorasick([normalize_text(criterion) for criterion in criteria])
 
 class CriteriaMatcher:
     """Enhanced criteria matching with improved accuracy"""
     
-    def __init__(self, llm_client):
+    def __init__(self, llm_client, json_handler=None, mode=None):
         self.llm_client = llm_client
+        self.json_handler = json_handler
+        # "per_criterion" sends one prompt per criterion, "combined" screens
+        # all criteria of a resume in one structured prompt
+        self.mode = mode or Config.CRITERIA_MODE
         
     async def analyze_criterion(self, resume_text, criterion, lang='en'):
         """Analyze resume against a single criterion with enhanced error handling"""
@@ -21,15 +40,18 @@ class CriteriaMatcher:
             "5. If no match is found, ONLY return '❌'\n"
         )
         
-        user_prompt = f"Resume Content:\n{resume_text}\n\nEvaluation Criterion:\n{criterion}"
-        full_prompt = f"[INST] {system_prompt}\n\n{user_prompt} [/INST]"
+        full_prompt, prefix = build_prompt(system_prompt, resume_text, f"Evaluation Criterion:\n{criterion}", lang)
         
         response = await self.llm_client.generate(
             prompt=full_prompt,
             max_tokens=10,
             temperature=0.1,
             top_p=0.3,
-            stop=["\n"]
+            stop=["\n"],
+            task="criteria",
+            document=resume_text,
+            trimmer=trim_sections,
+            prefix=prefix
         )
         
         if response["status"] == "error":
@@ -46,10 +68,64 @@ class CriteriaMatcher:
             logger.info(f"Criterion not matched: {criterion}")
             return f"❌ {criterion}"
     
+    @staticmethod
+    def parse_criterion(criterion):
+        """Split a criterion into its display text and whether it is semantic"""
+        stripped = criterion.strip()
+        for prefix in SEMANTIC_PREFIXES:
+            if stripped.lower().startswith(prefix):
+                return stripped[len(prefix):].strip(), True
+        return stripped, False
+    
     async def analyze_criteria_batch(self, resume_text, criteria_items, lang='en'):
-        """Process multiple criteria in parallel"""
+        """Process multiple criteria in parallel
+        
+        Literal criteria are answered by a local verbatim search when
+        ``Config.LOCAL_CRITERIA_MATCHING`` is on; only criteria marked
+        semantic ("semantic: ..." or "~...") are sent to the LLM.
+        """
         logger.info(f"Analyzing {len(criteria_items)} criteria")
         
+        if not Config.LOCAL_CRITERIA_MATCHING:
+            labels = [self.parse_criterion(criterion)[0] for criterion in criteria_items]
+            return await self._analyze_with_llm(resume_text, labels, lang)
+            
+        literal, semantic = [], []
+        for criterion in criteria_items:
+            label, is_semantic = self.parse_criterion(criterion)
+            (semantic if is_semantic else literal).append(label)
+            
+        results = {}
+        if literal:
+            results.update(self.match_verbatim(resume_text, literal))
+        if semantic:
+            logger.info(f"Sending {len(semantic)} semantic criteria to the LLM")
+            llm_results = await self._analyze_with_llm(resume_text, semantic, lang)
+            results.update(zip(semantic, llm_results))
+            
+        return [results[self.parse_criterion(criterion)[0]] for criterion in criteria_items]
+    
+    def match_verbatim(self, resume_text, criteria_items):
+        """Answer literal criteria locally with one pass over the normalized resume"""
+        criteria = tuple(dict.fromkeys(criteria_items))
+        matcher = build_verbatim_matcher(criteria)
+        found = matcher.matched_indices(normalize_text(resume_text))
+        
+        results = {}
+        for index, criterion in enumerate(criteria):
+            if index in found:
+                logger.info(f"Criterion matched verbatim: {criterion}")
+                results[criterion] = f"✅ {criterion}"
+            else:
+                logger.info(f"Criterion not found verbatim: {criterion}")
+                results[criterion] = f"❌ {criterion}"
+        return results
+    
+    async def _analyze_with_llm(self, resume_text, criteria_items, lang='en'):
+        """Evaluate criteria with the LLM in the configured mode"""
+        if self.mode == "combined" and len(criteria_items) > 1:
+            return await self.analyze_criteria_combined(resume_text, criteria_items, lang)
+            
         tasks = []
         for criterion in criteria_items:
             task = self.analyze_criterion(resume_text, criterion, lang)
@@ -57,6 +133,129 @@ class CriteriaMatcher:
             
         return await asyncio.gather(*tasks)
     
+    async def analyze_criteria_combined(self, resume_text, criteria_items, lang='en'):
+        """Screen all criteria with one prompt per chunk instead of one per criterion
+        
+        Criteria whose verdict cannot be read from the response are
+        re-evaluated individually with ``analyze_criterion``.
+        """
+        chunks = self._chunk_criteria(resume_text, criteria_items)
+        logger.info(f"Screening {len(criteria_items)} criteria in {len(chunks)} combined prompt(s)")
+        
+        chunk_results = await asyncio.gather(
+            *(self._analyze_chunk(resume_text, chunk, lang) for chunk in chunks)
+        )
+        verdicts = {}
+        for chunk_verdicts in chunk_results:
+            verdicts.update(chunk_verdicts)
+            
+        unparsed = [criterion for criterion in criteria_items if verdicts.get(criterion) is None]
+        if unparsed:
+            logger.info(f"Falling back to per-criterion calls for {len(unparsed)} unparsable verdict(s)")
+            fallback_results = await asyncio.gather(
+                *(self.analyze_criterion(resume_text, criterion, lang) for criterion in unparsed)
+            )
+            verdicts.update(zip(unparsed, fallback_results))
+            
+        return [verdicts[criterion] for criterion in criteria_items]
+    
+    def _chunk_criteria(self, resume_text, criteria_items):
+        """Split criteria so each combined prompt fits the criteria prompt budget"""
+        budget = LLMClient.prompt_budget("criteria")
+        # A long resume is trimmed to make room, so it never takes more than half
+        resume_tokens = min(len(resume_text) // CHARS_PER_TOKEN, budget // 2)
+        # Instructions and safety margin
+        available = budget - resume_tokens - 512
+        
+        chunks, current, used = [], [], 0
+        for criterion in dict.fromkeys(criteria_items):
+            # Criterion line in the prompt plus its entry in the JSON answer
+            cost = len(criterion) // CHARS_PER_TOKEN + 12
+            if current and (len(current) >= Config.CRITERIA_BATCH_SIZE or used + cost > available):
+                chunks.append(current)
+                current, used = [], 0
+            current.append(criterion)
+            used += cost
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    async def _analyze_chunk(self, resume_text, criteria_chunk, lang='en'):
+        """Evaluate one chunk of criteria; returns criterion -> result line (None if unparsable)"""
+        system_prompt = (
+            f"You are a Recruitment Assistant Expert. Analyze the ENTIRE {'French' if lang == 'fr' else 'English'} resume "
+            "and STRICTLY evaluate it against each numbered criterion below. Follow these rules:\n"
+            "1. Carefully scan ALL SECTIONS, including education, experience, skills, and projects.\n"
+            "2. A criterion matches only if the EXACT phrase appears VERBATIM anywhere in the resume.\n"
+            "3. Partial matches or close variations are NOT allowed.\n"
+            "4. Return a JSON object mapping every criterion number to '✅' (match) or '❌' (no match), "
+            "for example {\"1\": \"✅\", \"2\": \"❌\"}.\n"
+            "Format response as valid JSON only.\n"
+        )
+        
+        numbered = "\n".join(f"{i}. {criterion}" for i, criterion in enumerate(criteria_chunk, 1))
+        full_prompt, prefix = build_prompt(system_prompt, resume_text, f"Evaluation Criteria:\n{numbered}", lang)
+        
+        response = await self.llm_client.generate(
+            prompt=full_prompt,
+            max_tokens=12 * len(criteria_chunk) + 16,
+            temperature=0.1,
+            top_p=0.3,
+            task="criteria",
+            schema=criteria_schema(len(criteria_chunk)),
+            document=resume_text,
+            trimmer=trim_sections,
+            prefix=prefix
+        )
+        
+        if response["status"] == "error":
+            error = response.get('error', 'API request failed')
+            logger.warning(f"Error analyzing {len(criteria_chunk)} criteria: {error}")
+            return {criterion: f"❌ {criterion} (Error: {error})" for criterion in criteria_chunk}
+            
+        try:
+            data = response.get("data")
+            if data is None:
+                data = self._get_json_handler().clean_and_parse(response["result"])
+        except Exception as e:
+            logger.warning(f"Could not parse combined criteria response: {str(e)}")
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+            
+        results = {}
+        for i, criterion in enumerate(criteria_chunk, 1):
+            verdict = self._parse_verdict(data.get(str(i), data.get(criterion)))
+            if verdict is None:
+                results[criterion] = None
+            elif verdict:
+                logger.info(f"Criterion matched: {criterion}")
+                results[criterion] = f"✅ {criterion}"
+            else:
+                logger.info(f"Criterion not matched: {criterion}")
+                results[criterion] = f"❌ {criterion}"
+        return results
+    
+    @staticmethod
+    def _parse_verdict(value):
+        """Map a verdict value from the model to True/False, or None if unreadable"""
+        if isinstance(value, bool):
+            return value
+        if not isinstance(value, str):
+            return None
+        value = value.strip().upper()
+        if "✅" in value or value in ("PASS", "TRUE", "YES", "MATCH"):
+            return True
+        if "❌" in value or value in ("FAIL", "FALSE", "NO", "NO MATCH"):
+            return False
+        return None
+    
+    def _get_json_handler(self):
+        if self.json_handler is None:
+            from core.json_handler import JSONHandler
+            self.json_handler = JSONHandler()
+        return self.json_handler
+    
     def get_match_rate(self, criteria_results):
         """Calculate the match rate for criteria results"""
         if not criteria_results:
@@ -0,0 +1,110 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from utils.config import Config
+from utils.logging_setup import get_logger
+from core.llm_client import CHARS_PER_TOKEN
+from .skill_taxonomy import load_taxonomy
+from .text_matcher import normalize_text
+logger = get_logger(__name__)
+
+# Lines that usually state a requirement (English and French postings)
+_REQUIREMENT_HINTS = re.compile(
+    r"\b(?:requir|must|need|experience|skill|knowledge|proficien|familiar|degree|bachelor|master|"
+    r"years?\b|qualif|responsib|expert|abilit|able to|exig|comp[ée]tence|exp[ée]rience|ma[iî]trise|"
+    r"dipl[ôo]me|ans\b|connaissance|savoir)",
+    re.IGNORECASE
+)
+_BULLET = re.compile(r"^\s*(?:[-*•▪●◦‣–]|\d+[.)])\s+")
+# Sentence ends and inline bullets, for postings without line breaks
+_SEGMENT_BREAK = re.compile(r"(?<=[.;!?])\s+|\s+(?:[•▪●◦‣]|[-–](?=\s+[A-Z0-9]))\s+")
+
+class JobProfile:
+    """Everything derived from one job description, computed once per batch
+
+    ``normalized_text`` is the matching form of the text, ``required_skills``
+    the taxonomy skill groups it asks for, ``token_count`` an estimate of its
+    prompt size and ``digest`` a condensed list of its requirement lines plus
+    the key skills. ``prompt_text`` is what analyzers put in their prompts:
+    the full description when it is short, otherwise the digest.
+    """
+
+    def __init__(self, job_description, taxonomy=None):
+        taxonomy = taxonomy or load_taxonomy()
+        self.text = (job_description or "").strip()
+        self.hash = hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        self.normalized_text = normalize_text(self.text)
+        self.skills = taxonomy.skills_in(self.text)
+        self.required_skills = {taxonomy.groups[skill] for skill in self.skills}
+        self.token_count = len(self.text) // CHARS_PER_TOKEN
+        self.digest = self._build_digest(Config.JOB_DIGEST_MAX_CHARS)
+
+    def __bool__(self):
+        return bool(self.text)
+
+    @property
+    def prompt_text(self):
+        if self.token_count <= Config.JOB_DIGEST_MIN_TOKENS:
+            return self.text
+        return self.digest
+
+    def _candidate_lines(self):
+        lines = [line for line in self.text.splitlines() if line.strip()]
+        if len(lines) <= 2:
+            # PDF-pasted postings often arrive as one long line
+            lines = [part for line in lines for part in _SEGMENT_BREAK.split(line)]
+        return lines
+
+    def _build_digest(self, max_chars):
+        """Keep requirement-like lines, in order, within ``max_chars``"""
+        skills_line = f"Key skills: {', '.join(self.skills)}" if self.skills else ""
+        budget = max_chars - len(skills_line)
+        selected = []
+        seen = set()
+        for line in self._candidate_lines():
+            is_bullet = bool(_BULLET.match(line))
+            line = _BULLET.sub("", line).strip()
+            key = normalize_text(line)
+            if not key or key in seen or (key.endswith(":") and len(key) < 40):
+                # Skip duplicates and section headings such as "Requirements:"
+                continue
+            if not (is_bullet or _REQUIREMENT_HINTS.search(line)):
+                continue
+            if len(line) + 3 > budget:
+                break
+            seen.add(key)
+            selected.append(f"- {line}")
+            budget -= len(line) + 3
+
+        if not selected:
+            # Nothing looked like a requirement; keep the start of the text
+            head = self.text[:max(0, budget)].rsplit(" ", 1)[0] if len(self.text) > budget else self.text
+            selected.append(head)
+        if skills_line:
+            selected.append(skills_line)
+        return "\n".join(selected)
+
+_profiles = OrderedDict()
+_profiles_lock = threading.Lock()
+
+def get_job_profile(job_description, cache_size=32):
+    """Return the ``JobProfile`` for ``job_description``, reusing one built for identical text"""
+    key = hashlib.sha256((job_description or "").strip().encode("utf-8")).hexdigest()
+    with _profiles_lock:
+        profile = _profiles.get(key)
+        if profile is not None:
+            _profiles.move_to_end(key)
+            return profile
+
+    profile = JobProfile(job_description)
+    with _profiles_lock:
+        _profiles[key] = profile
+        while len(_profiles) > cache_size:
+            _profiles.popitem(last=False)
+    if profile:
+        logger.info(
+            f"Built job profile {key[:12]}: ~{profile.token_count} tokens, "
+            f"{len(profile.required_skills)} required skills, {len(profile.digest)} char digest"
+        )
+    return profile
@@ -0,0 +1,57 @@
+from utils.config import Config
+from core.llm_client import LLMClient, CHARS_PER_TOKEN
+from .section_segmenter import trim_sections
+
+TASK_FIRST = "task_first"
+SHARED_PREFIX = "shared_prefix"
+
+# Tasks whose prompts share the resume prefix
+SHARED_TASKS = ("criteria", "summary", "skill_match", "recommendation")
+# Room left in each prompt for the task's instructions and input
+TASK_RESERVE_TOKENS = 1024
+
+def shared_prefix(resume_text, lang='en'):
+    """Leading block shared by every prompt about one resume
+
+    Only the resume and its language go in here, so all analysis calls for
+    the resume start with the same tokens and Ollama can reuse the prefilled
+    prefix instead of processing the resume again.
+    """
+    return (
+        f"[INST] You are a Recruitment Expert. Below is a resume written in {'French' if lang == 'fr' else 'English'}, "
+        "followed by one analysis task about it. Base your answer only on this resume and follow the task's "
+        "instructions and output format exactly.\n\n"
+        f"Resume Content:\n{resume_text}\n\n"
+    )
+
+def _fit_shared_resume(resume_text):
+    """Trim the resume to fit the smallest prompt budget of ``SHARED_TASKS``
+
+    Each prompt is otherwise fitted to its own task's budget, so an oversized
+    resume would be cut differently per task and the prompts would no longer
+    share a prefix. The trim is deterministic, so every task gets the same text.
+    """
+    budget = min(LLMClient.prompt_budget(task, 1024) for task in SHARED_TASKS) - TASK_RESERVE_TOKENS
+    max_chars = max(0, budget) * CHARS_PER_TOKEN
+    if len(resume_text) <= max_chars:
+        return resume_text
+    return trim_sections(resume_text, max_chars, task="shared")
+
+def build_prompt(instructions, resume_text, task_input="", lang='en', layout=None):
+    """Assemble an analysis prompt; returns ``(prompt, prefix)``
+
+    With the "task_first" layout (default) the task instructions come first,
+    as they always have; ``prefix`` is None. With "shared_prefix" the prompt
+    starts with ``shared_prefix`` and the instructions and task input follow
+    the resume; ``prefix`` is that shared block, which ``LLMClient.generate``
+    uses to run calls for the same resume back to back. An oversized resume
+    is trimmed to the smallest budget of the tasks sharing the prefix.
+    """
+    layout = layout or Config.PROMPT_LAYOUT
+    if layout == SHARED_PREFIX:
+        prefix = shared_prefix(_fit_shared_resume(resume_text), lang)
+        tail = f"Task:\n{instructions}" + (f"\n{task_input}" if task_input else "")
+        return f"{prefix}{tail} [/INST]", prefix
+
+    user_prompt = f"Resume Content:\n{resume_text}" + (f"\n\n{task_input}" if task_input else "")
+    return f"[INST] {instructions}\n\n{user_prompt} [/INST]", None
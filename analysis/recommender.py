@@ -1,4 +1,8 @@
 from utils.logging_setup import get_logger
+from .job_profile import get_job_profile
+from .section_segmenter import section_trimmer
+from .prompt_layout import build_prompt
+from core.output_schemas import TASK_SCHEMAS, TASK_MAX_TOKENS
 logger = get_logger(__name__)
 
 class Recommender:
@@ -8,8 +12,10 @@ class Recommender:
         self.llm_client = llm_client
         self.json_handler = json_handler
         
-    async def get_recommendation(self, resume_text, job_description, criteria_results, filename, lang='en'):
+    async def get_recommendation(self, resume_text, job_description, criteria_results, filename, lang='en', job_profile=None):
         """Generate hiring recommendation based on resume analysis"""
+        job_profile = job_profile or get_job_profile(job_description)
+        
         # Combine criteria results into a summary
         criteria_summary = "\n".join(criteria_results)
         
@@ -26,20 +32,23 @@ class Recommender:
             "Format response as valid JSON only.\n"
         )
         
-        user_prompt = (
-            f"Resume Content:\n{resume_text}\n\n"
-            f"Job Description:\n{job_description}\n\n"
+        task_input = (
+            f"Job Description:\n{job_profile.prompt_text}\n\n"
             f"Criteria Evaluation Results:\n{criteria_summary}"
         )
-        
-        full_prompt = f"[INST] {system_prompt}\n\n{user_prompt} [/INST]"
+        full_prompt, prefix = build_prompt(system_prompt, resume_text, task_input, lang)
         
         # Request LLM analysis
         response = await self.llm_client.generate(
             prompt=full_prompt,
-            max_tokens=1024,
+            max_tokens=TASK_MAX_TOKENS["recommendation"] if self.llm_client.structured_output else 1024,
             temperature=0.3,
-            top_p=0.5
+            top_p=0.5,
+            task="recommendation",
+            schema=TASK_SCHEMAS["recommendation"],
+            document=resume_text,
+            trimmer=section_trimmer("recommendation"),
+            prefix=prefix
         )
         
         # Check for API errors
@@ -56,7 +65,10 @@ class Recommender:
             
         # Clean and parse JSON response
         try:
-            data = self.json_handler.clean_and_parse(result)
+            # Schema-constrained output arrives parsed; repair free-form output
+            data = response.get("data")
+            if data is None:
+                data = self.json_handler.clean_and_parse(result)
             logger.debug("Successfully parsed recommendation JSON")
             
             # Add filename
@@ -139,7 +151,25 @@ class Recommender:
             "strengths": strengths,
             "concerns": concerns,
             "interview_questions": questions,
-            "recommendation": recommendation
+            "recommendation": recommendation,
+            "fallback": True
+        }
+        
+    def quick_recommendation(self, criteria_results, skill_match, filename):
+        """Recommendation from criteria and skill scores alone, without the LLM (cascade mode)"""
+        matched_count = sum(1 for result in criteria_results if "✅" in result)
+        criteria_match_rate = (matched_count / len(criteria_results) * 100) if criteria_results else 0
+        skill_match_score = (skill_match or {}).get("match_score", 0)
+        recommendation, overall_rating = self.determine_recommendation_tier(criteria_match_rate, skill_match_score)
+        
+        return {
+            "filename": filename,
+            "overall_rating": overall_rating,
+            "strengths": [f"Has {skill}" for skill in (skill_match or {}).get("matching_skills", [])[:3]],
+            "concerns": [f"No mention of {skill}" for skill in (skill_match or {}).get("missing_skills", [])[:3]],
+            "interview_questions": [],
+            "recommendation": recommendation,
+            "source": "local"
         }
         
     def determine_recommendation_tier(self, criteria_match_rate, skill_match_score):
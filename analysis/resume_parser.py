@@ -4,6 +4,10 @@ import re
 import os
 from html import escape
 from utils.logging_setup import get_logger
+from .skill_taxonomy import load_taxonomy
+from .section_segmenter import section_trimmer
+from .prompt_layout import build_prompt
+from core.output_schemas import TASK_SCHEMAS, TASK_MAX_TOKENS
 logger = get_logger(__name__)
 
 # Import language detection with fallback
@@ -17,9 +21,10 @@ except ImportError:
 class ResumeParser:
     """Extract key information from resume text with robust fallbacks"""
     
-    def __init__(self, llm_client, json_handler):
+    def __init__(self, llm_client, json_handler, taxonomy=None):
         self.llm_client = llm_client
         self.json_handler = json_handler
+        self.taxonomy = taxonomy or load_taxonomy()
         self.email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
         self.phone_patterns = [
             r'\b\d{3}[-.\s]?\d{3}[-.\s]?\d{4}\b',  # 555-555-5555 format
@@ -48,26 +53,33 @@ class ResumeParser:
             "If you cannot find a value, use empty string for text fields and empty array for lists.\n"
         )
         
-        user_prompt = f"Resume Content:\n{resume_text}"
-        full_prompt = f"[INST] {system_prompt}\n\n{user_prompt} [/INST]"
+        full_prompt, prefix = build_prompt(system_prompt, resume_text, lang=lang)
         
         response = await self.llm_client.generate(
             prompt=full_prompt,
-            max_tokens=1024,
+            max_tokens=TASK_MAX_TOKENS["summary"] if self.llm_client.structured_output else 1024,
             temperature=0.1,
-            top_p=0.3
+            top_p=0.3,
+            task="summary",
+            schema=TASK_SCHEMAS["summary"],
+            document=resume_text,
+            trimmer=section_trimmer("summary"),
+            prefix=prefix
         )
         
         if response["status"] == "error":
             logger.warning(f"LLM API error when extracting resume summary: {response.get('error')}")
+            fallback_data["fallback"] = True
             return fallback_data
             
         # Process the response
         result = response["result"]
         
         try:
-            # Use the JSON handler to clean and parse the response
-            data = self.json_handler.clean_and_parse(result)
+            # Schema-constrained output arrives parsed; repair free-form output
+            data = response.get("data")
+            if data is None:
+                data = self.json_handler.clean_and_parse(result)
             
             # Add filename to the results
             data["filename"] = filename
@@ -77,6 +89,7 @@ class ResumeParser:
             
         except Exception as e:
             logger.error(f"Error processing resume summary: {str(e)}")
+            fallback_data["fallback"] = True
             return fallback_data
             
     def _extract_with_regex(self, resume_text):
@@ -155,23 +168,7 @@ class ResumeParser:
         
     def _extract_skills(self, resume_text, data):
         """Extract skills from resume text"""
-        common_skills = [
-            "python", "javascript", "java", "c++", "ruby", "go", "rust", "sql", 
-            "nosql", "react", "angular", "vue", "node", "express", "django", 
-            "flask", "rails", "spring", "bootstrap", "css", "html", "aws", 
-            "azure", "gcp", "docker", "kubernetes", "terraform", "ci/cd", "git", 
-            "agile", "scrum", "management", "leadership", "communication", 
-            "teamwork", "problem solving", "analytical", "creative", 
-            "time management", "project management", "marketing", "sales", 
-            "crm", "seo", "digital marketing", "content writing", "copywriting", 
-            "graphic design", "ui/ux", "product management", "data analysis", 
-            "machine learning", "ai"
-        ]
-        
-        found_skills = []
-        for skill in common_skills:
-            if re.search(r'\b' + re.escape(skill) + r'\b', resume_text, re.IGNORECASE):
-                found_skills.append(skill.title())
+        found_skills = [skill.title() for skill in self.taxonomy.skills_in(resume_text)]
                 
         if found_skills:
             data["top_skills"] = found_skills[:5]  # Take up to 5 skills
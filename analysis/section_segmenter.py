@@ -0,0 +1,218 @@
+import functools
+import re
+import unicodedata
+from utils.logging_setup import get_logger
+from core.llm_client import truncate_text
+logger = get_logger(__name__)
+
+# Section headings recognised in English and French resumes
+SECTION_HEADINGS = {
+    "contact": [
+        "contact", "contact information", "contact details", "personal information", "personal details",
+        "coordonnées", "informations personnelles", "état civil"
+    ],
+    "summary": [
+        "summary", "professional summary", "profile", "professional profile", "about me", "objective",
+        "career objective", "profil", "profil professionnel", "à propos", "à propos de moi", "objectif",
+        "objectif professionnel"
+    ],
+    "experience": [
+        "experience", "experiences", "work experience", "professional experience", "employment history",
+        "work history", "employment", "career history", "expérience", "expériences",
+        "expérience professionnelle", "expériences professionnelles", "parcours professionnel"
+    ],
+    "education": [
+        "education", "academic background", "education and training", "qualifications", "formation",
+        "formations", "diplômes", "études", "cursus", "formation académique", "parcours académique"
+    ],
+    "skills": [
+        "skills", "technical skills", "key skills", "core competencies", "competencies",
+        "skills and competencies", "languages", "compétences", "compétences techniques", "compétences clés",
+        "savoir-faire", "langues"
+    ],
+    "projects": [
+        "projects", "personal projects", "key projects", "projets", "projets personnels", "réalisations"
+    ],
+    "other": [
+        "certifications", "certificates", "awards", "publications", "interests", "hobbies", "references",
+        "volunteering", "certificats", "centres d'intérêt", "centres d’intérêt", "loisirs", "références",
+        "bénévolat", "distinctions"
+    ]
+}
+
+def _build_heading_pattern():
+    aliases = {}
+    for label, headings in SECTION_HEADINGS.items():
+        for heading in headings:
+            aliases[heading] = label
+    # Longest first so "work experience" wins over "experience"
+    ordered = sorted(aliases, key=len, reverse=True)
+    alternation = "|".join(r"\s+".join(map(re.escape, heading.split())) for heading in ordered)
+    pattern = re.compile(rf"(?<!\w)({alternation})(?!\w)", re.IGNORECASE)
+    return pattern, {heading.casefold(): label for heading, label in aliases.items()}
+
+_HEADING_PATTERN, _HEADING_LABELS = _build_heading_pattern()
+_LINE_DECORATION = re.compile(r"^[\s\-–•*#>|=_.\d)]*$")
+
+class ResumeSections:
+    """A resume split into labelled sections
+
+    ``spans`` is a list of ``(label, start, end)`` in document order; text
+    before the first heading is labelled "header" (usually name and
+    contact details). A label can occur more than once. ``line_mode`` tells
+    whether the text kept its line breaks, i.e. whether headings could be
+    recognised reliably.
+    """
+
+    def __init__(self, text, spans, line_mode=True):
+        self.text = text
+        self.spans = spans
+        self.line_mode = line_mode
+
+    @property
+    def labels(self):
+        return {label for label, _, _ in self.spans}
+
+    @property
+    def is_segmented(self):
+        """Whether any section heading was found at all"""
+        return any(label != "header" for label in self.labels)
+
+    def select(self, labels):
+        """Text of the given sections in document order
+
+        Falls back to the full text when no heading was recognised, none of
+        the requested sections exists or the text had its line breaks
+        collapsed (where a title-case heading mid-sentence goes unnoticed
+        and its section would be lost), so a stage never gets less than it
+        would have without segmentation.
+        """
+        wanted = set(labels)
+        if not self.line_mode or not self.is_segmented or not (wanted & self.labels - {"header"}):
+            return self.text
+        parts = [self.text[start:end].strip() for label, start, end in self.spans if label in wanted]
+        return "\n\n".join(part for part in parts if part)
+
+def _is_heading(text, match, line_mode):
+    """Decide whether an alias occurrence is a heading rather than prose"""
+    if line_mode:
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        line_end = text.find("\n", match.end())
+        before = text[line_start:match.start()]
+        after = text[match.end():line_end if line_end != -1 else len(text)]
+        if _LINE_DECORATION.match(before) and _LINE_DECORATION.match(after.replace(":", "")):
+            return True
+    if text[match.end():match.end() + 5].lstrip().startswith(":"):
+        return True
+    # Upper-case headings survive whitespace collapsing ("EXPERIENCE Acme Corp ...")
+    letters = [ch for ch in match.group(0) if ch.isalpha()]
+    if len(letters) >= 4 and all(ch.isupper() for ch in letters):
+        return True
+    # A title-case heading right after a sentence end ("... systems. Work Experience Acme ...")
+    words = match.group(0).split()
+    previous = text[max(0, match.start() - 20):match.start()].rstrip()
+    following = text[match.end():match.end() + 20].lstrip()
+    return (
+        all(word[0].isupper() for word in words if word[0].isalpha())
+        and (not previous or previous[-1] in ".!?;|•")
+        and following[:1].isupper()
+    )
+
+def segment_resume(text):
+    """Split extracted resume text into ``ResumeSections``
+
+    Works on text with line breaks (a heading is a line of its own) and on
+    whitespace-collapsed text, where only upper-case headings, headings
+    followed by a colon and title-case headings starting a sentence are
+    trusted.
+    """
+    text = unicodedata.normalize("NFC", text or "")
+    line_mode = text.count("\n") >= 5
+
+    spans = []
+    label, start = "header", 0
+    for match in _HEADING_PATTERN.finditer(text):
+        if not _is_heading(text, match, line_mode):
+            continue
+        if match.start() > start:
+            spans.append((label, start, match.start()))
+        label = _HEADING_LABELS[" ".join(match.group(0).split()).casefold()]
+        start = match.start()
+    if len(text) > start:
+        spans.append((label, start, len(text)))
+
+    sections = ResumeSections(text, spans, line_mode)
+    logger.debug(f"Segmented resume into {len(spans)} sections: {sorted(sections.labels)}")
+    return sections
+
+# Sections by importance to each task, most important first; trimming drops
+# and shortens them from the end of the list
+TRIM_PRIORITIES = {
+    "summary": ("header", "contact", "experience", "education", "skills", "summary", "projects", "other"),
+    "skill_match": ("skills", "experience", "summary", "projects", "header", "contact", "education", "other"),
+    "recommendation": ("experience", "skills", "summary", "education", "projects", "header", "contact", "other"),
+    # The resume block shared by every task's prompt (see prompt_layout)
+    "shared": ("header", "contact", "skills", "education", "experience", "summary", "projects", "other")
+}
+DEFAULT_TRIM_PRIORITY = ("experience", "header", "contact", "skills", "education", "summary", "projects", "other")
+# Sections a task is never without: shortened only as a last resort, never dropped
+TRIM_PROTECTED = {
+    "summary": ("header", "contact", "education"),
+    "shared": ("header", "contact", "skills", "education")
+}
+# What is left of a section when its tail is cut
+_MIN_SECTION_CHARS = 300
+
+def _join(parts):
+    return "\n\n".join(part for part in parts if part)
+
+def trim_sections(text, max_chars, task=None):
+    """Shrink resume text to ``max_chars``, keeping what ``task`` needs most
+
+    Sections are ranked by ``TRIM_PRIORITIES[task]``. Their tails are cut
+    first, least important section first and none below a few lines; if
+    that is not enough, the least important sections are dropped whole,
+    last occurrence first (never a ``TRIM_PROTECTED`` one, nor the last
+    one left), and what is
+    left is cut at a word boundary. Usable as the ``trimmer`` of
+    ``LLMClient.generate``, see ``section_trimmer``.
+    """
+    if len(text) <= max_chars:
+        return text
+    priority = TRIM_PRIORITIES.get(task, DEFAULT_TRIM_PRIORITY)
+    protected = TRIM_PROTECTED.get(task, ())
+    rank = {label: i for i, label in enumerate(priority)}
+    sections = segment_resume(text)
+    parts = [[label, sections.text[start:end].strip()] for label, start, end in sections.spans]
+    # Least important first; protected sections are cut last
+    order = sorted(
+        set(label for label, _ in parts),
+        key=lambda label: (label in protected, -rank.get(label, len(priority)))
+    )
+
+    def excess():
+        return len(_join(part for _, part in parts)) - max_chars
+
+    for label in order:
+        for part in parts:
+            over = excess()
+            if over <= 0:
+                break
+            if part[0] == label and len(part[1]) > _MIN_SECTION_CHARS:
+                part[1] = truncate_text(part[1], max(_MIN_SECTION_CHARS, len(part[1]) - over))
+    for label in order:
+        if label in protected:
+            continue
+        # Later occurrences of a section go first
+        for part in reversed([part for part in parts if part[0] == label]):
+            if excess() <= 0 or len(parts) == 1:
+                break
+            parts.remove(part)
+
+    trimmed = truncate_text(_join(part for _, part in parts), max_chars)
+    logger.debug(f"Trimmed resume from {len(text)} to {len(trimmed)} characters for task '{task or 'default'}'")
+    return trimmed
+
+def section_trimmer(task):
+    """``trim_sections`` for ``task``, as a ``trimmer`` for ``LLMClient.generate``"""
+    return functools.partial(trim_sections, task=task)
@@ -1,19 +1,31 @@
 import re
 from utils.logging_setup import get_logger
 logger = get_logger(__name__)
-from utils.config import Config
+from .skill_taxonomy import load_taxonomy
+from .skill_scorer import BatchSkillScorer
+from .job_profile import get_job_profile
+from .section_segmenter import section_trimmer
+from .prompt_layout import build_prompt
+from core.output_schemas import TASK_SCHEMAS, TASK_MAX_TOKENS
 
 class SkillAnalyzer:
     """Analyze skills in resume against job requirements"""
     
-    def __init__(self, llm_client, json_handler):
+    def __init__(self, llm_client, json_handler, taxonomy=None):
         self.llm_client = llm_client
         self.json_handler = json_handler
+        self.taxonomy = taxonomy or load_taxonomy()
+        
+    async def get_skill_match(self, resume_text, job_description, filename, lang='en', job_profile=None):
+        """Calculate skill match score between resume and job description
+        
+        ``job_profile`` is the batch's ``JobProfile``; built from
+        ``job_description`` when not given.
+        """
+        job_profile = job_profile or get_job_profile(job_description)
         
-    async def get_skill_match(self, resume_text, job_description, filename, lang='en'):
-        """Calculate skill match score between resume and job description"""
         # First try exact skill matching as fallback
-        fallback_match = self._extract_skills_manually(resume_text, job_description)
+        fallback_match = self._extract_skills_manually(resume_text, job_description, job_profile.required_skills)
         fallback_match["filename"] = filename
         
         # Prepare LLM prompt
@@ -27,21 +39,26 @@ class SkillAnalyzer:
             "Format response as valid JSON only.\n"
         )
         
-        user_prompt = f"Resume Content:\n{resume_text}\n\nJob Description:\n{job_description}"
-        full_prompt = f"[INST] {system_prompt}\n\n{user_prompt} [/INST]"
+        full_prompt, prefix = build_prompt(system_prompt, resume_text, f"Job Description:\n{job_profile.prompt_text}", lang)
         
         # Request LLM analysis
         response = await self.llm_client.generate(
             prompt=full_prompt,
-            max_tokens=1024,
+            max_tokens=TASK_MAX_TOKENS["skill_match"] if self.llm_client.structured_output else 1024,
             temperature=0.1,
-            top_p=0.3
+            top_p=0.3,
+            task="skill_match",
+            schema=TASK_SCHEMAS["skill_match"],
+            document=resume_text,
+            trimmer=section_trimmer("skill_match"),
+            prefix=prefix
         )
         
         # Check for API errors
         if response["status"] == "error":
             logger.warning(f"API error when calculating skill match: {response.get('error')}")
             logger.info("Using manual skill extraction due to API error")
+            fallback_match["fallback"] = True
             return fallback_match
             
         result = response["result"]
@@ -50,11 +67,15 @@ class SkillAnalyzer:
         if not result:
             logger.warning("Empty response received from API for skill match")
             logger.info("Using manual skill extraction due to empty API response")
+            fallback_match["fallback"] = True
             return fallback_match
             
         # Clean and parse JSON response
         try:
-            data = self.json_handler.clean_and_parse(result)
+            # Schema-constrained output arrives parsed; repair free-form output
+            data = response.get("data")
+            if data is None:
+                data = self.json_handler.clean_and_parse(result)
             logger.debug("Successfully parsed skill match JSON")
             
             # Add filename to the results
@@ -84,67 +105,16 @@ class SkillAnalyzer:
         except Exception as e:
             logger.error(f"Error processing skill match data: {str(e)}")
             logger.info("Using manual skill extraction due to processing error")
+            fallback_match["fallback"] = True
             return fallback_match
     
-    def _extract_skills_manually(self, resume_text, job_description):
+    def _extract_skills_manually(self, resume_text, job_description, job_skills=None):
         """Extract skills from resume and job description using keyword matching"""
-        # Common tech and soft skills to look for
-        common_skills = {
-            # Programming languages
-            "python": ["python", "py", "django", "flask"],
-            "javascript": ["javascript", "js", "node", "react", "angular", "vue"],
-            "java": ["java", "spring", "j2ee"],
-            "c#": ["c#", ".net", "asp.net"],
-            "c++": ["c++", "cpp"],
-            "go": ["golang", "go lang"],
-            "ruby": ["ruby", "rails"],
-            "php": ["php", "laravel", "symfony"],
-            
-            # Databases
-            "sql": ["sql", "mysql", "postgresql", "oracle"],
-            "nosql": ["nosql", "mongodb", "dynamodb", "cosmosdb"],
-            
-            # Cloud platforms
-            "aws": ["aws", "amazon web services", "ec2", "s3", "lambda"],
-            "azure": ["azure", "microsoft azure"],
-            "gcp": ["gcp", "google cloud"],
-            
-            # DevOps & tools
-            "docker": ["docker", "container"],
-            "kubernetes": ["kubernetes", "k8s"],
-            "jenkins": ["jenkins", "ci/cd"],
-            "git": ["git", "github", "gitlab"],
-            
-            # Project management
-            "agile": ["agile", "scrum", "kanban"],
-            "jira": ["jira", "atlassian"],
-            
-            # Soft skills
-            "communication": ["communication", "interpersonal"],
-            "leadership": ["leadership", "team lead", "manager"],
-            "problem solving": ["problem solving", "analytical"],
-            "team player": ["team player", "teamwork", "collaboration"]
-        }
-        
-        # Find skills in resume and job description
-        resume_skills = set()
-        job_skills = set()
-        
-        resume_text_lower = resume_text.lower()
-        job_description_lower = job_description.lower()
-        
-        for skill, keywords in common_skills.items():
-            # Check resume
-            for keyword in keywords:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', resume_text_lower):
-                    resume_skills.add(skill)
-                    break
-                    
-            # Check job description
-            for keyword in keywords:
-                if re.search(r'\b' + re.escape(keyword) + r'\b', job_description_lower):
-                    job_skills.add(skill)
-                    break
+        # Skills are compared at group level, so Django in the resume covers
+        # Python in the job description
+        resume_skills = self.taxonomy.groups_in(resume_text)
+        if job_skills is None:
+            job_skills = self.taxonomy.groups_in(job_description)
         
         # Calculate matching and missing skills
         matching_skills = resume_skills.intersection(job_skills)
@@ -163,6 +133,23 @@ class SkillAnalyzer:
             "missing_skills": list(missing_skills)[:5]     # Limit to 5 skills
         }
         
+    def quick_skill_match(self, resume_text, job_description, filename, job_profile=None):
+        """Keyword-only skill match for resumes that skip the LLM (cascade mode)"""
+        job_profile = job_profile or get_job_profile(job_description)
+        match = self._extract_skills_manually(resume_text, job_description, job_profile.required_skills)
+        match["filename"] = filename
+        match["source"] = "local"
+        return match
+        
+    def score_batch(self, resume_texts, job_descriptions):
+        """Keyword-match many resumes against one or more job descriptions at once
+        
+        Returns a ``SkillScores`` with per-pair scores, matching and missing
+        skills and per-job rankings; ``as_match`` gives the same dict as
+        ``_extract_skills_manually`` without a pass per resume.
+        """
+        return BatchSkillScorer(self.taxonomy).score(resume_texts, job_descriptions)
+        
     def highlight_matching_skills(self, resume_text, matching_skills):
         """Highlight occurrences of matching skills in resume text"""
         highlighted_text = resume_text
@@ -0,0 +1,114 @@
+from utils.logging_setup import get_logger
+from .skill_taxonomy import load_taxonomy
+logger = get_logger(__name__)
+
+# NumPy is optional; without it the same results are computed with sets
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class SkillScores:
+    """Skill match results for a batch of resumes against one or more jobs
+
+    ``score(r, j)`` is the percentage of job ``j``'s skills found in resume
+    ``r``, the same measure ``SkillAnalyzer`` uses for its non-LLM fallback.
+    Resume and job arguments are positions in the lists given to
+    ``BatchSkillScorer.score``.
+    """
+
+    def __init__(self, skills, resume_rows, job_rows, scores):
+        self.skills = skills
+        self._resume_rows = resume_rows
+        self._job_rows = job_rows
+        self._scores = scores
+
+    @property
+    def scores(self):
+        """Resume x job score matrix (a NumPy array, or nested lists without NumPy)"""
+        return self._scores
+
+    def score(self, resume, job=0):
+        return int(self._scores[resume][job])
+
+    def _columns(self, rows, index):
+        if np is not None:
+            return set(np.flatnonzero(rows[index]).tolist())
+        return rows[index]
+
+    def matching_skills(self, resume, job=0):
+        """Job skills present in the resume, in taxonomy order"""
+        columns = self._columns(self._resume_rows, resume) & self._columns(self._job_rows, job)
+        return [self.skills[column] for column in sorted(columns)]
+
+    def missing_skills(self, resume, job=0):
+        """Job skills absent from the resume, in taxonomy order"""
+        columns = self._columns(self._job_rows, job) - self._columns(self._resume_rows, resume)
+        return [self.skills[column] for column in sorted(columns)]
+
+    def ranking(self, job=0):
+        """Resume positions sorted by descending score (ties keep batch order)"""
+        if np is not None:
+            return np.argsort(-self._scores[:, job], kind="stable").tolist()
+        return sorted(range(len(self._scores)), key=lambda resume: -self._scores[resume][job])
+
+    def as_match(self, resume, job=0, limit=5):
+        """Result dict in the format of ``SkillAnalyzer._extract_skills_manually``"""
+        return {
+            "match_score": self.score(resume, job),
+            "matching_skills": self.matching_skills(resume, job)[:limit],
+            "missing_skills": self.missing_skills(resume, job)[:limit]
+        }
+
+class BatchSkillScorer:
+    """Score every resume of a batch against job descriptions in one pass
+
+    Each document is scanned once with the skill taxonomy to build a
+    document x skill-group incidence matrix; all resume/job scores then come
+    from a single matrix product. The taxonomy has a few dozen groups, so
+    the boolean matrix stays small (a few MB for 50k resumes).
+    """
+
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy or load_taxonomy()
+        # One column per skill group, in taxonomy order
+        self.skills = list(dict.fromkeys(self.taxonomy.groups[skill] for skill in self.taxonomy.skills))
+        self._columns = {skill: i for i, skill in enumerate(self.skills)}
+
+    def incidence(self, texts):
+        """Skill-group incidence rows for ``texts``
+
+        A boolean ``len(texts) x len(self.skills)`` array with NumPy,
+        otherwise a list of column-index sets.
+        """
+        rows = [{self._columns[group] for group in self.taxonomy.groups_in(text or "")} for text in texts]
+        if np is None:
+            return rows
+        matrix = np.zeros((len(rows), len(self.skills)), dtype=bool)
+        for i, columns in enumerate(rows):
+            if columns:
+                matrix[i, list(columns)] = True
+        return matrix
+
+    def score(self, resume_texts, job_descriptions):
+        """Score all resumes against all job descriptions
+
+        ``job_descriptions`` may be a single string or a list of them.
+        """
+        if isinstance(job_descriptions, str):
+            job_descriptions = [job_descriptions]
+        resume_rows = self.incidence(resume_texts)
+        job_rows = self.incidence(job_descriptions)
+
+        if np is not None:
+            matched = resume_rows.astype(np.int32) @ job_rows.T.astype(np.int32)
+            required = job_rows.sum(axis=1)
+            scores = np.where(required > 0, matched * 100 // np.maximum(required, 1), 0)
+        else:
+            scores = [
+                [len(resume & job) * 100 // len(job) if job else 0 for job in job_rows]
+                for resume in resume_rows
+            ]
+
+        logger.debug(f"Scored {len(resume_texts)} resumes against {len(job_descriptions)} job descriptions")
+        return SkillScores(self.skills, resume_rows, job_rows, scores)
@@ -0,0 +1,84 @@
+import json
+import os
+from functools import lru_cache
+from utils.config import Config
+from utils.logging_setup import get_logger
+from .text_matcher import AhoCorasick, normalize_text, normalize_with_offsets
+logger = get_logger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class SkillTaxonomy:
+    """Canonical skills, their aliases and skill groups, matched in one pass
+
+    Each skill entry has a canonical ``name``, optional ``aliases`` (the
+    phrases that mean this skill; defaults to the name itself), an optional
+    ``group`` naming a broader skill it counts towards (Django counts as
+    Python) and an optional ``category``. All aliases are compiled into a
+    single Aho-Corasick automaton, so finding every skill in a document costs
+    one scan regardless of the taxonomy size.
+    """
+
+    def __init__(self, skills):
+        self.skills = []
+        self.groups = {}
+        self.categories = {}
+        patterns = []
+        owners = []
+        for entry in skills:
+            name = normalize_text(entry["name"])
+            if not name or name in self.groups:
+                continue
+            self.skills.append(name)
+            self.groups[name] = normalize_text(entry.get("group") or "") or name
+            self.categories[name] = entry.get("category")
+            for alias in entry.get("aliases") or [name]:
+                alias = normalize_text(alias)
+                if alias:
+                    patterns.append(alias)
+                    owners.append(name)
+        self._order = {name: i for i, name in enumerate(self.skills)}
+        self._owners = owners
+        self._matcher = AhoCorasick(patterns)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["skills"] if isinstance(data, dict) else data)
+
+    def find(self, text):
+        """List ``(skill, start, end)`` for every skill mention in ``text``
+
+        Positions index into ``text`` itself. Overlapping aliases are all
+        reported, e.g. both "microsoft azure" and "azure".
+        """
+        normalized, offsets = normalize_with_offsets(text)
+        return [
+            (self._owners[index], offsets[start], offsets[end - 1] + 1)
+            for start, end, index in self._matcher.find_all(normalized)
+        ]
+
+    def skills_in(self, text):
+        """Canonical skills mentioned in ``text``, in taxonomy order"""
+        normalized = normalize_text(text)
+        found = {self._owners[index] for index in self._matcher.matched_indices(normalized)}
+        return sorted(found, key=self._order.get)
+
+    def groups_in(self, text):
+        """Set of skill groups mentioned in ``text`` (a skill without a group is its own group)"""
+        return {self.groups[skill] for skill in self.skills_in(text)}
+
+@lru_cache(maxsize=4)
+def load_taxonomy(path=None):
+    """Load and compile the skill taxonomy once per path
+
+    Relative paths are resolved against the working directory first and
+    then against the project root.
+    """
+    path = path or Config.SKILL_TAXONOMY_PATH
+    if not os.path.isabs(path) and not os.path.exists(path):
+        path = os.path.join(_PROJECT_ROOT, path)
+    taxonomy = SkillTaxonomy.from_file(path)
+    logger.info(f"Loaded skill taxonomy with {len(taxonomy.skills)} skills from {path}")
+    return taxonomy
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from utils.logging_setup import get_logger
+logger = get_logger(__name__)
+
+class StageScheduler:
+    """Run the analysis stages of one resume as a small dependency graph
+
+    Stages without dependencies start immediately and run concurrently; a
+    dependent stage starts as soon as all of its inputs are available. The
+    results of a stage's dependencies are passed to it as keyword arguments
+    named after those stages.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.timings = {}
+
+    def add_stage(self, name, func, depends_on=()):
+        """Register a stage; ``func`` is an async callable taking its dependencies' results"""
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already registered")
+        self.stages[name] = (func, tuple(depends_on))
+        return self
+
+    def _check_graph(self):
+        """Reject unknown dependencies and cycles before anything is started"""
+        for name, (_, deps) in self.stages.items():
+            for dep in deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle detected at '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name][1]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(self):
+        """Run all stages and return a dict of stage name -> result
+
+        Per-stage wall-clock durations (excluding time spent waiting for
+        dependencies) are recorded in ``self.timings``. If any stage raises,
+        the remaining stages are cancelled and the error is propagated.
+        """
+        self._check_graph()
+        tasks = {}
+
+        async def run_stage(name):
+            func, deps = self.stages[name]
+            inputs = {}
+            for dep in deps:
+                inputs[dep] = await tasks[dep]
+            started = time.perf_counter()
+            try:
+                return await func(**inputs)
+            finally:
+                self.timings[name] = round(time.perf_counter() - started, 3)
+                logger.debug(f"Stage '{name}' finished in {self.timings[name]}s")
+
+        for name in self.stages:
+            tasks[name] = asyncio.ensure_future(run_stage(name))
+
+        try:
+            values = await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            # Let cancelled stages unwind before propagating the error
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return dict(zip(tasks.keys(), values))
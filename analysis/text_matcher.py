@@ -0,0 +1,118 @@
+import re
+import unicodedata
+from collections import deque
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text):
+    """Normalize text for literal matching: Unicode NFKC, case-folded, single spaces"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return _WHITESPACE.sub(" ", text).strip()
+
+def normalize_with_offsets(text):
+    """Normalize like ``normalize_text`` but keep a map back to the original
+    
+    Returns ``(normalized, offsets)`` where ``offsets[i]`` is the index in
+    ``text`` of the character that produced ``normalized[i]``, so match
+    positions can be reported against the original text. Characters are
+    normalized one at a time, which matches ``normalize_text`` except for
+    rare combining sequences.
+    """
+    chars = []
+    offsets = []
+    in_space = True
+    for i, ch in enumerate(text or ""):
+        if ch.isspace():
+            if not in_space:
+                chars.append(" ")
+                offsets.append(i)
+                in_space = True
+            continue
+        in_space = False
+        for out in unicodedata.normalize("NFKC", ch).casefold():
+            chars.append(out)
+            offsets.append(i)
+    if chars and chars[-1] == " ":
+        chars.pop()
+        offsets.pop()
+    return "".join(chars), offsets
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+class AhoCorasick:
+    """Multi-pattern string matcher (Aho-Corasick automaton)
+
+    The automaton is built once from a list of patterns and then finds every
+    occurrence of every pattern in a single left-to-right pass over the text,
+    independent of the number of patterns. Patterns are matched as given, so
+    normalize patterns and text the same way (see ``normalize_text``).
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                    self._goto[node][ch] = child
+                node = child
+            self._out[node] += (index,)
+
+        # Breadth-first pass to link each state to its longest proper suffix
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and ch not in self._goto[state]:
+                    state = self._fail[state]
+                self._fail[child] = self._goto[state].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Yield ``(start, end, pattern_index)`` for every occurrence in ``text``"""
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self.patterns
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for index in out[node]:
+                yield i + 1 - len(patterns[index]), i + 1, index
+
+    def find_all(self, text, whole_words=True):
+        """List matches, optionally only those not embedded in a longer word
+
+        With ``whole_words`` a pattern edge that is a letter or digit must
+        not touch another letter or digit, so "java" does not match inside
+        "javascript" while "c++" still matches "c++,".
+        """
+        matches = []
+        for start, end, index in self.iter_matches(text):
+            if whole_words:
+                pattern = self.patterns[index]
+                if _is_word_char(pattern[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(pattern[-1]) and end < len(text) and _is_word_char(text[end]):
+                    continue
+            matches.append((start, end, index))
+        return matches
+
+    def matched_indices(self, text, whole_words=True):
+        """Set of pattern indices that occur at least once in ``text``"""
+        return {index for _, _, index in self.find_all(text, whole_words)}
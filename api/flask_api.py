@@ -1,12 +1,18 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
 import os
+import queue
 import tempfile
 import json
-import asyncio
 from utils.logging_setup import get_logger
 logger = get_logger(__name__)
 from utils.config import Config
 from analysis import ResumeBatch
+from api.job_manager import Job, JobManager
+
+class UploadedFile:
+    """File object for a saved upload, as expected by ResumeBatch"""
+    def __init__(self, filepath):
+        self.name = filepath
 
 class FlaskAPI:
     """Flask API for programmatic access to resume analysis"""
@@ -16,6 +22,11 @@ class FlaskAPI:
         self.llm_client = llm_client
         self.json_handler = json_handler
         self.report_generator = report_generator
+        self.job_manager = JobManager(
+            self._run_analysis_job,
+            num_workers=Config.JOB_WORKERS,
+            history_limit=Config.JOB_HISTORY_LIMIT
+        )
         self.app = Flask(__name__)
         self.configure_routes()
         
@@ -27,83 +38,79 @@ class FlaskAPI:
             
         @self.app.route('/api/analyze', methods=['POST'])
         def analyze_resumes():
-            # Check if files were uploaded
-            if 'files' not in request.files:
-                return jsonify({"error": "No files provided"}), 400
-                
-            files = request.files.getlist('files')
-            if not files or files[0].filename == '':
-                return jsonify({"error": "No files selected"}), 400
+            payload, error = self._parse_analysis_request()
+            if error:
+                return error
                 
-            # Get criteria and job description
-            criteria_text = request.form.get('criteria', '')
-            job_description = request.form.get('job_description', '')
+            # Runs on a background worker's event loop; this request just waits
+            job = self.job_manager.submit(payload, cleanup=lambda: self._remove_files(payload["files"]))
+            job.wait()
             
-            if not criteria_text:
-                return jsonify({"error": "Criteria is required"}), 400
-                
-            # Save files to temporary location
-            temp_files = []
-            for file in files:
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp:
-                    file.save(temp.name)
-                    temp_files.append(temp.name)
-                    
-            # Parse criteria
-            criteria_items = []
-            for line in criteria_text.split('\n'):
-                if ',' in line:
-                    criteria_items.extend([item.strip() for item in line.split(',') if item.strip()])
-                else:
-                    if line.strip():
-                        criteria_items.append(line.strip())
-                        
-            if not criteria_items:
-                criteria_items = [criteria_text.strip()]
-                
-            # Process resumes
-            try:
-                # Create batch processor
-                resume_batch = ResumeBatch(self.pdf_processor, self.llm_client, self.json_handler)
-                
-                # Process in async context
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                # Create file objects
-                class FileObj:
-                    def __init__(self, filepath):
-                        self.name = filepath
-                        
-                file_objs = [FileObj(f) for f in temp_files]
-                
-                # Run analysis
-                summary, detailed_results = loop.run_until_complete(
-                    resume_batch.process_resumes(file_objs, criteria_items, job_description)
-                )
-                
-                # Clean up temporary files
-                for file_path in temp_files:
-                    try:
-                        os.unlink(file_path)
-                    except:
-                        pass
-                        
+            if job.status == Job.COMPLETED:
                 return jsonify({
                     "status": "success",
-                    "results": detailed_results
+                    "results": job.results
                 })
+            logger.error(f"API error: {job.error or job.status}")
+            return jsonify({"error": job.error or f"Analysis {job.status}"}), 500
+            
+        @self.app.route('/api/analyze/stream', methods=['POST'])
+        def analyze_resumes_stream():
+            payload, error = self._parse_analysis_request()
+            if error:
+                return error
                 
-            except Exception as e:
-                # Clean up temporary files
-                for file_path in temp_files:
-                    try:
-                        os.unlink(file_path)
-                    except:
-                        pass
-                        
-                logger.error(f"API error: {str(e)}")
-                return jsonify({"error": str(e)}), 500
+            use_sse = (request.args.get('format') == 'sse'
+                       or 'text/event-stream' in request.headers.get('Accept', ''))
+            job = self.job_manager.submit(
+                payload, cleanup=lambda: self._remove_files(payload["files"]), stream=True
+            )
+            return Response(
+                self._stream_job_events(job, use_sse),
+                mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+                headers={"Cache-Control": "no-cache", "X-Job-Id": job.id}
+            )
+            
+        @self.app.route('/api/jobs', methods=['POST'])
+        def submit_job():
+            payload, error = self._parse_analysis_request()
+            if error:
+                return error
+                
+            job = self.job_manager.submit(payload, cleanup=lambda: self._remove_files(payload["files"]))
+            response = job.to_dict()
+            response["status_url"] = f"/api/jobs/{job.id}"
+            response["results_url"] = f"/api/jobs/{job.id}/results"
+            return jsonify(response), 202
+            
+        @self.app.route('/api/jobs/<job_id>', methods=['GET'])
+        def job_status(job_id):
+            job = self.job_manager.get(job_id)
+            if job is None:
+                return jsonify({"error": "Unknown job"}), 404
+            return jsonify(job.to_dict())
+            
+        @self.app.route('/api/jobs/<job_id>/results', methods=['GET'])
+        def job_results(job_id):
+            job = self.job_manager.get(job_id)
+            if job is None:
+                return jsonify({"error": "Unknown job"}), 404
+            if job.status != Job.COMPLETED:
+                response = job.to_dict()
+                response["error"] = job.error or f"Job is {job.status}"
+                return jsonify(response), 409
+            return jsonify({
+                "status": "success",
+                "job_id": job.id,
+                "results": job.results
+            })
+            
+        @self.app.route('/api/jobs/<job_id>', methods=['DELETE'])
+        def cancel_job(job_id):
+            job = self.job_manager.cancel(job_id)
+            if job is None:
+                return jsonify({"error": "Unknown job"}), 404
+            return jsonify(job.to_dict())
                 
         @self.app.route('/api/generate-report', methods=['POST'])
         def generate_report():
@@ -131,6 +138,123 @@ class FlaskAPI:
                 logger.error(f"Report generation error: {str(e)}")
                 return jsonify({"error": str(e)}), 500
                 
+    def _parse_analysis_request(self):
+        """Validate an analysis upload; returns (payload, None) or (None, error response)"""
+        # Check if files were uploaded
+        if 'files' not in request.files:
+            return None, (jsonify({"error": "No files provided"}), 400)
+            
+        files = request.files.getlist('files')
+        if not files or files[0].filename == '':
+            return None, (jsonify({"error": "No files selected"}), 400)
+            
+        # Get criteria and job description
+        criteria_text = request.form.get('criteria', '')
+        job_description = request.form.get('job_description', '')
+        
+        if not criteria_text:
+            return None, (jsonify({"error": "Criteria is required"}), 400)
+            
+        # Optional cascade settings: deep LLM analysis only for the best candidates
+        try:
+            top_k = int(request.form['top_k']) if request.form.get('top_k') else None
+            min_score = float(request.form['min_score']) if request.form.get('min_score') else None
+        except ValueError:
+            return None, (jsonify({"error": "top_k and min_score must be numbers"}), 400)
+            
+        # Save files to temporary location
+        temp_files = []
+        for file in files:
+            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp:
+                file.save(temp.name)
+                temp_files.append(temp.name)
+                
+        # Parse criteria
+        criteria_items = []
+        for line in criteria_text.split('\n'):
+            if ',' in line:
+                criteria_items.extend([item.strip() for item in line.split(',') if item.strip()])
+            else:
+                if line.strip():
+                    criteria_items.append(line.strip())
+                    
+        if not criteria_items:
+            criteria_items = [criteria_text.strip()]
+            
+        return {
+            "files": temp_files,
+            "criteria_items": criteria_items,
+            "job_description": job_description,
+            "top_k": top_k,
+            "min_score": min_score
+        }, None
+        
+    async def _run_analysis_job(self, job):
+        """Job runner: analyze the uploaded resumes of one job"""
+        resume_batch = ResumeBatch(self.pdf_processor, self.llm_client, self.json_handler)
+        file_objs = [UploadedFile(path) for path in job.payload["files"]]
+        if job.events is None:
+            return await resume_batch.process_resumes(
+                file_objs,
+                job.payload["criteria_items"],
+                job.payload["job_description"],
+                progress_callback=job.update_progress,
+                top_k=job.payload.get("top_k"),
+                min_score=job.payload.get("min_score")
+            )
+            
+        records = [None] * len(file_objs)
+        async for record in resume_batch.iter_results(
+            file_objs, job.payload["criteria_items"], job.payload["job_description"],
+            top_k=job.payload.get("top_k"), min_score=job.payload.get("min_score")
+        ):
+            records[record["index"]] = record
+            job.update_progress(record["done"], record["total"])
+            job.publish({
+                "event": "result",
+                "index": record["index"],
+                "filename": record["filename"],
+                "has_match": record["has_match"],
+                "result": record["result"],
+                "error": None if record["result"] is not None else record["candidate_entry"]
+            })
+            job.publish({"event": "progress", "done": record["done"], "total": record["total"]})
+        return None, [record["result"] for record in records if record["result"] is not None]
+        
+    def _stream_job_events(self, job, use_sse=False):
+        """Yield a streaming job's events as NDJSON lines or Server-Sent Events"""
+        def encode(event):
+            data = json.dumps(event, ensure_ascii=False)
+            if use_sse:
+                return f"event: {event['event']}\ndata: {data}\n\n"
+            return data + "\n"
+            
+        try:
+            yield encode({"event": "job", "job_id": job.id, "total": job.total})
+            while True:
+                try:
+                    event = job.events.get(timeout=Config.STREAM_PROGRESS_INTERVAL)
+                except queue.Empty:
+                    # Periodic progress doubles as a keep-alive for proxies
+                    event = {"event": "progress", "done": job.done, "total": job.total}
+                yield encode(event)
+                if event["event"] == "end":
+                    break
+        finally:
+            # The client went away before the batch finished
+            if not job.is_finished:
+                logger.info(f"Stream for job {job.id} closed early, cancelling")
+                self.job_manager.cancel(job.id)
+        
+    @staticmethod
+    def _remove_files(paths):
+        """Clean up temporary files"""
+        for file_path in paths:
+            try:
+                os.unlink(file_path)
+            except:
+                pass
+                
     def run(self, host="0.0.0.0", port=5000, debug=False):
         """Run the Flask API server"""
         self.app.run(host=host, port=port, debug=debug)
\ No newline at end of file
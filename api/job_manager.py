@@ -0,0 +1,188 @@
+import asyncio
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from utils.logging_setup import get_logger
+logger = get_logger(__name__)
+
+class Job:
+    """State of one background analysis job"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+    def __init__(self, payload, cleanup=None, stream=False):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.cleanup = cleanup
+        self.status = self.QUEUED
+        self.done = 0
+        self.total = len(payload.get("files", [])) if isinstance(payload, dict) else 0
+        self.summary = None
+        self.results = None
+        self.error = None
+        self.created_at = datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = threading.Event()
+        self.cancel_requested = False
+        # Per-resume events for streaming consumers (thread-safe)
+        self.events = queue.Queue() if stream else None
+        self._task = None
+        self._loop = None
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATES
+
+    def update_progress(self, done, total):
+        """Progress callback for ResumeBatch.process_resumes"""
+        self.done = done
+        self.total = total
+
+    def publish(self, event):
+        """Hand an event to the streaming consumer, if any"""
+        if self.events is not None:
+            self.events.put(event)
+
+    def wait(self, timeout=None):
+        """Block until the job reaches a final state"""
+        return self.finished.wait(timeout)
+
+    def to_dict(self):
+        """Status view of the job (results are served separately)"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": {"done": self.done, "total": self.total},
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobManager:
+    """Queue of analysis jobs drained by a pool of background workers
+
+    Each worker thread owns one long-lived event loop, so pooled LLM clients
+    are reused across jobs instead of a new loop being created per request.
+    ``runner`` is an async callable taking a ``Job`` and returning
+    ``(summary, detailed_results)``.
+    """
+
+    def __init__(self, runner, num_workers=2, history_limit=100):
+        self.runner = runner
+        self.num_workers = max(1, num_workers)
+        self.history_limit = history_limit
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(self, payload, cleanup=None, stream=False):
+        """Queue a job and return it immediately"""
+        job = Job(payload, cleanup, stream)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._trim_history()
+        self._ensure_workers()
+        self._queue.put(job)
+        logger.info(f"Queued job {job.id} ({job.total} resumes)")
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued or running job; returns the job or None if unknown"""
+        job = self.jobs.get(job_id)
+        if job is None or job.is_finished:
+            return job
+        job.cancel_requested = True
+        with self._lock:
+            if job.status == Job.QUEUED:
+                # The worker skips it when it comes off the queue
+                self._finish(job, Job.CANCELLED)
+                return job
+        task, loop = job._task, job._loop
+        if loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+        return job
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs beyond the history limit (caller holds the lock)"""
+        excess = len(self.jobs) - self.history_limit
+        for job_id in list(self.jobs):
+            if excess <= 0:
+                break
+            if self.jobs[job_id].is_finished:
+                del self.jobs[job_id]
+                excess -= 1
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished_at = datetime.now().isoformat()
+        if job.cleanup:
+            try:
+                job.cleanup()
+            except Exception as e:
+                logger.warning(f"Cleanup for job {job.id} failed: {str(e)}")
+        job.finished.set()
+        job.publish({"event": "end", "status": status, "error": error})
+
+    def _worker_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            job = self._queue.get()
+            try:
+                with self._lock:
+                    if job.status != Job.QUEUED:
+                        continue
+                    job.status = Job.RUNNING
+                    job.started_at = datetime.now().isoformat()
+                    job._loop = loop
+                loop.run_until_complete(self._run_job(job))
+            except Exception as e:
+                logger.error(f"Job worker error: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job):
+        job._task = asyncio.current_task()
+        logger.info(f"Starting job {job.id}")
+        try:
+            if job.cancel_requested:
+                # Cancelled between leaving the queue and getting a task
+                raise asyncio.CancelledError()
+            job.summary, job.results = await self.runner(job)
+        except asyncio.CancelledError:
+            logger.info(f"Job {job.id} cancelled")
+            self._finish(job, Job.CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            self._finish(job, Job.FAILED, str(e))
+        else:
+            logger.info(f"Job {job.id} completed")
+            self._finish(job, Job.COMPLETED)
+        finally:
+            job._task = None
@@ -0,0 +1,84 @@
+"""Micro-benchmark: lenient single-pass JSON parsing vs. the old regex repair pipeline
+
+Parses a corpus of typical malformed model responses (prose around the
+JSON, code fences, unquoted keys, single quotes, trailing commas, truncated
+output) with both implementations and reports the time per response.
+
+    python -m benchmarks.json_parsing --repeat 2000
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.json_handler import JSONHandler
+
+SAMPLES = [
+    'Sure! Here is the analysis:\n```json\n{\n  "match_score": 72,\n  "matching_skills": ["Python", "Docker", "AWS",],\n'
+    '  "missing_skills": ["Kubernetes", "Terraform"],\n}\n```\nLet me know if you need anything else.',
+    "{name: 'Jane Doe', email: 'jane.doe@example.com', phone: '+1 555 010 9999', years_experience: 7,\n"
+    " education: 'MSc Computer Science, Example University', top_skills: ['Python', 'SQL', 'Spark'],\n"
+    " last_position: 'Senior Data Engineer at Acme'}",
+    '{"overall_rating": 7, "strengths": ["Solid backend experience", "Cloud deployments"], "concerns": '
+    '["No people management", "Short tenures"], "interview_questions": ["Describe a production incident you led", '
+    '"How do you approach schema migrations',
+    '{"match_score": 64\n"matching_skills": ["Java", "Spring"]\n"missing_skills": ["Go"]\n}'
+    + "\n\nNote: the score reflects skills alignment only and does not consider soft skills. " * 8,
+]
+
+def regex_pipeline(json_str):
+    """The regex repair pipeline JSONHandler.clean_and_parse used before the lenient parser
+
+    Copied for comparison, with its code-fence pattern fixed so it compiles.
+    """
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+    result = str(json_str)
+    json_match = re.search(r'(\{[\s\S]*\})', result)
+    if json_match:
+        result = json_match.group(1)
+    result = re.sub(r'```(?:json)?\s*', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'```\s*$', '', result, flags=re.IGNORECASE)
+    result = re.sub(r'"([^"]+\s+[^"]+)":', lambda m: f'"{m.group(1).replace(" ", "_")}":', result)
+    result = re.sub(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b(?=\s*:)', r'"\1"', result)
+    result = result.replace("'", '"')
+    result = re.sub(r',\s*(?=[\]}])', '', result)
+    result = re.sub(r'(["}\d])\s*\n\s*"', r'\1,\n"', result)
+    result = re.sub(r':\s*"(true|false)"', r': \1', result, flags=re.IGNORECASE)
+    result = re.sub(r':\s*"(\d+)"', r': \1', result)
+    if result.count('{') > result.count('}'):
+        result += '}' * (result.count('{') - result.count('}'))
+    if result.count('[') > result.count(']'):
+        result += ']' * (result.count('[') - result.count(']'))
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        return JSONHandler()._extract_fields_with_regex(json_str)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="Parses of each sample per implementation")
+    args = parser.parse_args()
+    # The regex pipeline logs a warning on every fallback
+    logging.disable(logging.WARNING)
+
+    handler = JSONHandler()
+    implementations = {"regex pipeline": regex_pipeline, "lenient parser": handler.clean_and_parse}
+
+    print(f"{'sample':<8}{'implementation':<18}{'us/parse':>10}  keys recovered")
+    for i, sample in enumerate(SAMPLES, 1):
+        for name, parse in implementations.items():
+            seconds = timeit.timeit(lambda: parse(sample), number=args.repeat)
+            data = parse(sample)
+            keys = sorted(data) if isinstance(data, dict) else type(data).__name__
+            print(f"{i:<8}{name:<18}{seconds / args.repeat * 1e6:>10.1f}  {keys}")
+
+if __name__ == "__main__":
+    main()
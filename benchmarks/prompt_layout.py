@@ -0,0 +1,98 @@
+"""Compare Ollama prefill time of the task-first and shared-prefix prompt layouts
+
+Runs the four per-resume analysis calls (criteria, summary, skill match,
+recommendation) for every resume under each layout against a live Ollama
+server and reports prompt tokens evaluated and prefill time per call, as
+reported by the server (``prompt_eval_count`` / ``prompt_eval_duration``).
+The response cache is disabled so every call reaches the server.
+
+    python -m benchmarks.prompt_layout resumes/*.pdf --job job.txt --criteria criteria.txt
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.config import Config
+from utils.config_class import Config as LLMConfig
+from core.json_handler import JSONHandler
+from core.llm_client import LLMClient
+from core.pdf_processor import PDFProcessor
+from analysis.criteria_matcher import CriteriaMatcher
+from analysis.prompt_layout import SHARED_PREFIX, TASK_FIRST
+from analysis.recommender import Recommender
+from analysis.resume_parser import ResumeParser
+from analysis.skill_analyzer import SkillAnalyzer
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+async def _run_layout(layout, resumes, job_description, criteria_items):
+    Config.PROMPT_LAYOUT = layout
+    llm_client = LLMClient(response_cache=False)
+    json_handler = JSONHandler()
+    criteria_matcher = CriteriaMatcher(llm_client, json_handler)
+    resume_parser = ResumeParser(llm_client, json_handler)
+    skill_analyzer = SkillAnalyzer(llm_client, json_handler)
+    recommender = Recommender(llm_client, json_handler)
+
+    started = time.perf_counter()
+    try:
+        for filename, text in resumes:
+            # Same order ResumeBatch runs the stages in, one resume at a time
+            criteria = await criteria_matcher.analyze_criteria_batch(text, criteria_items)
+            await resume_parser.extract_resume_summary(text, filename)
+            if job_description:
+                await skill_analyzer.get_skill_match(text, job_description, filename)
+                await recommender.get_recommendation(text, job_description, criteria, filename)
+    finally:
+        await llm_client.aclose()
+    elapsed = time.perf_counter() - started
+
+    stats = llm_client.get_token_stats().values()
+    calls = sum(s["calls"] for s in stats) or 1
+    return {
+        "calls": calls,
+        "prompt_tokens": sum(s["prompt_tokens"] for s in stats) / calls,
+        "prefill_ms": sum(s["prefill_ms"] for s in stats) / calls,
+        "wall_s": elapsed
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("resumes", nargs="+", help="Resume PDFs or text files")
+    parser.add_argument("--job", help="Job description text file")
+    parser.add_argument("--criteria", help="Criteria text file, one criterion per line")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per layout (alternating)")
+    args = parser.parse_args()
+
+    pdf_processor = PDFProcessor(text_cache=False)
+    resumes = [
+        (os.path.basename(path), pdf_processor.extract_text(path) if path.lower().endswith(".pdf") else _read(path))
+        for path in args.resumes
+    ]
+    job_description = _read(args.job) if args.job else ""
+    criteria_items = [line.strip() for line in _read(args.criteria).splitlines() if line.strip()] if args.criteria else []
+
+    results = {TASK_FIRST: [], SHARED_PREFIX: []}
+    for _ in range(args.repeat):
+        for layout in results:
+            results[layout].append(await _run_layout(layout, resumes, job_description, criteria_items))
+
+    print(f"{len(resumes)} resumes, model {LLMConfig.LLM_MODEL}, keep_alive {LLMConfig.LLM_KEEP_ALIVE or 'default'}")
+    print(f"{'layout':<15}{'calls':>8}{'prompt tok/call':>18}{'prefill ms/call':>18}{'wall s':>10}")
+    for layout, runs in results.items():
+        n = len(runs)
+        print(
+            f"{layout:<15}{runs[0]['calls']:>8}"
+            f"{sum(r['prompt_tokens'] for r in runs) / n:>18.0f}"
+            f"{sum(r['prefill_ms'] for r in runs) / n:>18.1f}"
+            f"{sum(r['wall_s'] for r in runs) / n:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,196 @@
+# core/adaptive_limiter.py
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class CallTiming:
+    """Yielded by ``AdaptiveConcurrencyLimiter.slot``; the call reports its first token here"""
+
+    __slots__ = ("started", "first_token")
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_token = None
+
+    def first_token_received(self):
+        if self.first_token is None:
+            self.first_token = time.monotonic()
+
+    @property
+    def latency(self):
+        """Time to first token, or None if no token was reported"""
+        return None if self.first_token is None else self.first_token - self.started
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency window for calls to one LLM backend/model
+
+    The window grows by roughly one slot per window's worth of successful,
+    saturated calls (additive increase) and is halved when a call fails or
+    when short-term latency drifts well above the long-term average
+    (multiplicative decrease). Latency is time to first token, which
+    reflects server load whatever the length of the output; calls that do
+    not report it only count for errors. The limiter is thread-safe and can be shared
+    by coroutines running on different event loops, which is how the Flask
+    API and the Gradio UI drive the same LLMClient.
+    """
+
+    def __init__(self, name, initial_limit=4, min_limit=1, max_limit=32,
+                 latency_tolerance=2.0, backoff_ratio=0.5):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+        # Short- and long-term time-to-first-token averages (seconds)
+        self._fast_latency = None
+        self._slow_latency = None
+        self._since_decrease = self.window
+        self.successes = 0
+        self.errors = 0
+        self.decreases = 0
+
+    @property
+    def window(self):
+        """Current number of calls allowed in flight"""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self):
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        """Number of callers waiting for a slot"""
+        return len(self._waiters)
+
+    async def acquire(self):
+        """Wait for a slot in the window"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._in_flight < self.window and not self._waiters:
+                self._in_flight += 1
+                return
+            waiter = loop.create_future()
+            entry = (loop, waiter)
+            self._waiters.append(entry)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(entry)
+                    granted = False
+                except ValueError:
+                    # A slot was handed over before the cancellation landed
+                    granted = True
+            if granted:
+                self._release_slot()
+            raise
+
+    def release(self, latency=None, error=False):
+        """Return a slot and feed the call outcome into the window"""
+        with self._lock:
+            self._record(latency, error)
+        self._release_slot()
+
+    def _release_slot(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiters()
+
+    def _grant_waiters(self):
+        """Hand free slots to waiters in FIFO order (caller holds the lock)"""
+        while self._waiters and self._in_flight < self.window:
+            loop, waiter = self._waiters.popleft()
+            self._in_flight += 1
+            try:
+                loop.call_soon_threadsafe(self._wake, waiter)
+            except RuntimeError:
+                # The waiter's loop is closed; give the slot back
+                self._in_flight -= 1
+
+    @staticmethod
+    def _wake(waiter):
+        if not waiter.done():
+            waiter.set_result(None)
+
+    def _record(self, latency, error):
+        """Update the window from one completed call (caller holds the lock)"""
+        self._since_decrease += 1
+        if error:
+            self.errors += 1
+            self._decrease("error")
+            return
+
+        self.successes += 1
+        if latency is not None:
+            if self._slow_latency is None:
+                self._fast_latency = self._slow_latency = latency
+            else:
+                self._fast_latency += 0.3 * (latency - self._fast_latency)
+                self._slow_latency += 0.02 * (latency - self._slow_latency)
+            if self._fast_latency > self._slow_latency * self.latency_tolerance:
+                self._decrease("latency")
+                return
+
+        # Only grow when the window is actually the bottleneck
+        if self._in_flight >= self.window and self._limit < self.max_limit:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _decrease(self, reason):
+        # At most one decrease per window's worth of completions, so a burst
+        # of simultaneous timeouts does not collapse the window to the floor
+        if self._since_decrease < self.window or self._limit <= self.min_limit:
+            return
+        previous = self.window
+        self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+        self._since_decrease = 0
+        self.decreases += 1
+        if self._fast_latency is not None and reason == "latency":
+            # Start measuring again from the new baseline
+            self._fast_latency = self._slow_latency
+        logger.info(f"Concurrency window for {self.name} reduced {previous} -> {self.window} ({reason})")
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the duration of one call, recording latency and errors
+        
+        Yields a ``CallTiming``; call its ``first_token_received()`` when
+        the response starts arriving.
+        """
+        await self.acquire()
+        timing = CallTiming()
+        try:
+            yield timing
+        except asyncio.CancelledError:
+            # Cancellation says nothing about backend health
+            self._release_slot()
+            raise
+        except Exception:
+            self.release(timing.latency, error=True)
+            raise
+        else:
+            self.release(timing.latency)
+
+    def stats(self):
+        """Snapshot of the limiter state"""
+        with self._lock:
+            return {
+                "window": self.window,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "successes": self.successes,
+                "errors": self.errors,
+                "decreases": self.decreases,
+                "avg_first_token": round(self._slow_latency, 3) if self._slow_latency is not None else None
+            }
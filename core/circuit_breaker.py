@@ -0,0 +1,92 @@
+# core/circuit_breaker.py
+import threading
+import time
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class CircuitBreaker:
+    """Stop calling a backend that keeps failing
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    ``allow()`` refuses calls for ``reset_timeout`` seconds. It then lets a
+    single probe call through (half-open): success closes the breaker, a
+    failure opens it again, and a probe that never reports back (e.g. a
+    cancelled call) is replaced after another ``reset_timeout``.
+    Thread-safe, so one breaker can guard a server used from several event
+    loops.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self):
+        """Whether a call may go ahead now (claims the probe when half-open)"""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if state == self.HALF_OPEN and (not self._probing or now - self._probe_started >= self.reset_timeout):
+                self._probing = True
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit breaker for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+                self.trips += 1
+                logger.warning(
+                    f"Circuit breaker for {self.name} opened after {self._failures} consecutive failures; "
+                    f"retrying in {self.reset_timeout:.0f}s"
+                )
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected
+            }
@@ -0,0 +1,171 @@
+# core/disk_cache.py
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from utils.logging_setup import get_logger
+
+logger = get_logger(__name__)
+
+class DiskLRUCache:
+    """Size-bounded persistent key/value store backed by SQLite
+
+    Values are JSON-serialisable objects. Entries are evicted in least
+    recently used order once the stored payload exceeds ``max_bytes``, and
+    entries older than ``ttl`` seconds (if set) are treated as misses. The
+    size is summed inside the write transaction, so the budget holds even
+    when several stores or processes share the file; within a process use
+    ``shared()`` to get one store (and connection) per file.
+    """
+
+    # Absolute path -> store, see shared()
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, path, max_bytes=256 * 1024 * 1024, ttl=None):
+        """Return the process-wide store for ``path``, opening it on first use
+
+        Later calls get the same instance whatever their ``max_bytes`` and
+        ``ttl``. Shared stores are closed at interpreter exit.
+        """
+        key = os.path.abspath(path)
+        with cls._shared_lock:
+            store = cls._shared.get(key)
+            if store is None:
+                if not cls._shared:
+                    atexit.register(cls.close_shared)
+                store = cls._shared[key] = cls(path, max_bytes, ttl)
+            return store
+
+    @classmethod
+    def close_shared(cls):
+        """Close and forget every store opened with ``shared()``"""
+        with cls._shared_lock:
+            stores = list(cls._shared.values())
+            cls._shared.clear()
+        for store in stores:
+            store.close()
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, ttl=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)")
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, refreshing its LRU position"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+
+            value, created = row
+            if self.ttl and now - created > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.misses += 1
+                return default
+
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+
+        try:
+            return json.loads(value)
+        except ValueError:
+            logger.warning(f"Discarding corrupt cache entry {key[:12]}")
+            self.delete(key)
+            return default
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` and evict old entries if over budget"""
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {size} byte entry larger than the cache budget")
+            return False
+
+        now = time.time()
+        with self._lock:
+            # One write transaction, so no other writer slips in between
+            # the insert and the size check
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, size, now, now)
+                )
+                self._evict()
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def _total_bytes(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used entries until within budget (caller holds the lock)"""
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                return
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
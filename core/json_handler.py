@@ -2,6 +2,7 @@ import os
 import json
 import logging
 import re
+from .lenient_json import parse_lenient
 
 logger = logging.getLogger(__name__)
 
@@ -9,67 +10,22 @@ class JSONHandler:
     """Combined JSON cleaning and parsing pipeline"""
 
     def clean_and_parse(self, json_str):
-        """Comprehensive JSON cleaning for LLM responses"""
-        # First, try basic parsing
+        """Parse an LLM response, tolerating the usual JSON mistakes"""
+        # Well-formed output takes the fast path
         try:
             return json.loads(json_str)
         except json.JSONDecodeError:
-            # Apply progressive cleaning steps
-            cleaned_json = self._apply_cleaning_pipeline(json_str)
-            
-            try:
-                return json.loads(cleaned_json)
-            except json.JSONDecodeError:
-                # Try extraction-based approach as final fallback
-                return self._extract_fields_with_regex(json_str)
-    
-    def _apply_cleaning_pipeline(self, json_str):
-        """Apply progressive JSON cleaning steps from both systems"""
-        result = str(json_str)
-        
-        # Logging for debugging
-        logger.debug(f"Original JSON before cleaning: {result[:100]}...")
-        
-        # Extract JSON content (if wrapped in other text)
-        json_match = re.search(r'(\{[\s\S]*\})', result)
-        if json_match:
-            result = json_match.group(1)
-            
-        # 1. Remove code blocks markers
-        result = re.sub(r'```(? :json)?\s*', '', result, flags=re.IGNORECASE)
-        result = re.sub(r'```\s*$', '', result, flags=re.IGNORECASE)
-        
-        # 2. Fix property names with spaces
-        result = re.sub(r'"([^"]+\s+[^"]+)":',
-                        lambda m: f'"{m.group(1).replace(" ", "_")}":', 
-                        result)
-        
-        # 3. Fix unquoted property names
-        result = re.sub(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b(?=\s*:)',
-                        r'"\1"', 
-                        result)
-        
-        # 4. Convert single quotes to double quotes
-        result = result.replace("'", '"')
-        
-        # 5. Remove trailing commas
-        result = re.sub(r',\s*(?=[\]}])', '', result)
-        
-        # 6. Add missing commas between properties
-        result = re.sub(r'(["}\d])\s*\n\s*"', r'\1,\n"', result)
-        
-        # 7. Fix boolean and numeric values
-        result = re.sub(r':\s*"(true|false)"', r': \1', result, flags=re.IGNORECASE)
-        result = re.sub(r':\s*"(\d+)"', r': \1', result)
+            pass
         
-        # 8. Fix missing braces or brackets if needed
-        if result.count('{') > result.count('}'):
-            result += '}' * (result.count('{') - result.count('}'))
-        if result.count('[') > result.count(']'):
-            result += ']' * (result.count('[') - result.count(']'))
+        # One lenient pass handles fences, prose, unquoted keys, single
+        # quotes, missing/trailing commas and truncated output
+        data = parse_lenient(str(json_str))
+        if data is not None:
+            logger.debug(f"Parsed malformed JSON leniently: {str(json_str)[:100]}...")
+            return data
         
-        logger.debug(f"Cleaned JSON: {result[:100]}...")
-        return result
+        # No object at all: scrape known fields as a last resort
+        return self._extract_fields_with_regex(json_str)
         
     def _extract_fields_with_regex(self, json_str):
         """Extract fields using regex patterns when JSON parsing fails"""
@@ -0,0 +1,233 @@
+# core/lenient_json.py
+import re
+
+# Next character that ends the current run inside each kind of token
+_STRING_SPECIAL = {'"': re.compile(r'["\\]'), "'": re.compile(r"['\\]")}
+_BARE_KEY_END = re.compile(r"[:,{}\[\]]")
+# A quote also ends a bare value: '1 "b": 2' is a missing comma, but a
+# single quote only after a space, since words like O'Brien contain one
+_BARE_VALUE_END = re.compile(r"[,}\]\n\"]|\s'")
+_ROOT_START = re.compile(r"[{\[]")
+_OBJECT_START = re.compile(r"\{")
+_SEPARATORS = re.compile(r"[\s,:]+")
+_INTEGER = re.compile(r"-?\d+")
+_FLOAT = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_ESCAPES = {'"': '"', "'": "'", "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_LITERALS = {"true": True, "false": False, "null": None, "none": None}
+
+class LenientJSONParser:
+    """Single-pass, incremental parser for JSON written by a language model
+
+    Text is fed in chunks of any size and each character is looked at once.
+    Everything before the first ``{`` or ``[`` (prose, code fences) and after
+    the matching close is ignored. An object is preferred: a complete array
+    root (e.g. "Here is the analysis [JSON]:") is set aside while scanning
+    for an object, and only returned by ``close()`` if none follows. Inside,
+    the parser accepts what models commonly get wrong: unquoted keys,
+    single-quoted strings, unescaped quotes inside strings, trailing commas,
+    missing commas at line ends or before a quote, bare words as values and
+    a truncated tail, whose open strings and containers are closed by
+    ``close()``.
+    """
+
+    def __init__(self):
+        self.root = None
+        # A complete array root, kept in case no object follows
+        self._array = None
+        self.done = False
+        self.truncated = False
+        # Open containers as [container, pending key] frames
+        self._stack = []
+        self._state = "seek"
+        self._buffer = []
+        self._quote = None
+        self._is_key = False
+        self._escape = ""
+        self._unicode_escapes = False
+        self._gap = []
+        self._gap_newline = False
+
+    @property
+    def value(self):
+        """The object parsed so far (filled in place as more text arrives)"""
+        return self.root
+
+    def feed(self, text):
+        """Consume the next chunk; returns True once the root value is complete"""
+        i, n = 0, len(text)
+        while i < n and not self.done:
+            state = self._state
+            if state == "seek":
+                match = (_ROOT_START if self._array is None else _OBJECT_START).search(text, i)
+                if not match:
+                    break
+                self._open({} if match.group() == "{" else [])
+                i = match.end()
+            elif state == "structure":
+                i = self._structure(text, i)
+            elif state == "string":
+                match = _STRING_SPECIAL[self._quote].search(text, i)
+                if not match:
+                    self._buffer.append(text[i:])
+                    break
+                self._buffer.append(text[i:match.start()])
+                i = match.end()
+                if match.group() == "\\":
+                    self._state = "escape"
+                else:
+                    # Only a real end if structure or a new line follows
+                    self._state = "string_end"
+                    self._gap = []
+                    self._gap_newline = False
+            elif state == "escape":
+                self._read_escape(text[i])
+                i += 1
+            elif state == "string_end":
+                char = text[i]
+                if char.isspace():
+                    self._gap.append(char)
+                    self._gap_newline = self._gap_newline or char in "\r\n"
+                    i += 1
+                elif char in ",:}]" or self._gap_newline or (self._gap and char in "\"'"):
+                    self._finish_string()
+                else:
+                    # A quote inside the text, e.g. 'it's' or "the "best" one";
+                    # a quote after a space starts the next string instead
+                    self._buffer.append(self._quote + "".join(self._gap))
+                    self._state = "string"
+            else:  # bare
+                pattern = _BARE_KEY_END if self._is_key else _BARE_VALUE_END
+                match = pattern.search(text, i)
+                if not match:
+                    self._buffer.append(text[i:])
+                    break
+                self._buffer.append(text[i:match.start()])
+                i = match.start()
+                if self._finish_bare(match.group()):
+                    i += 1
+        return self.done
+
+    def close(self):
+        """Finish parsing (closing anything left open) and return the value"""
+        if not self.done:
+            if self._state in ("string", "escape", "string_end"):
+                self._finish_string()
+            elif self._state == "bare":
+                self._finish_bare(None)
+            self.truncated = self.truncated or bool(self._stack)
+            self._stack.clear()
+            self.done = True
+            if self.root is None:
+                self.root = self._array
+        return self.root
+
+    def _structure(self, text, i):
+        """Handle the text between tokens at ``i``; returns the next index"""
+        char = text[i]
+        if char.isspace() or char in ",:":
+            # Separators are skipped, so missing or trailing commas do not matter
+            return _SEPARATORS.match(text, i).end()
+        if char in "}]":
+            self._stack.pop()
+            if not self._stack:
+                if isinstance(self.root, dict):
+                    self.done = True
+                else:
+                    # Keep looking for an object
+                    self._array, self.root = self.root, None
+                    self._state = "seek"
+        elif char in "{[":
+            self._open({} if char == "{" else [])
+        elif char in "\"'":
+            self._start(string=True, quote=char)
+        else:
+            # Start of an unquoted key or value
+            self._start(string=False)
+            return i
+        return i + 1
+
+    def _expects_key(self):
+        frame = self._stack[-1]
+        return isinstance(frame[0], dict) and frame[1] is None
+
+    def _start(self, string, quote=None):
+        self._is_key = self._expects_key()
+        self._buffer = []
+        self._quote = quote
+        self._state = "string" if string else "bare"
+
+    def _open(self, container):
+        if self._stack:
+            self._add(container)
+        else:
+            self.root = container
+        self._stack.append([container, None])
+        self._state = "structure"
+
+    def _add(self, value):
+        frame = self._stack[-1]
+        if isinstance(frame[0], list):
+            frame[0].append(value)
+        elif frame[1] is not None:
+            frame[0][frame[1]] = value
+            frame[1] = None
+
+    def _read_escape(self, char):
+        escape = self._escape + char
+        if escape[0] != "u":
+            self._buffer.append(_ESCAPES.get(char, char))
+        elif len(escape) < 5:
+            self._escape = escape
+            return
+        else:
+            try:
+                self._buffer.append(chr(int(escape[1:], 16)))
+                self._unicode_escapes = True
+            except ValueError:
+                self._buffer.append("\\" + escape)
+        self._escape = ""
+        self._state = "string"
+
+    def _finish_string(self):
+        text = "".join(self._buffer)
+        if self._unicode_escapes:
+            # \uXXXX escapes may encode a surrogate pair
+            text = text.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+            self._unicode_escapes = False
+        self._escape = ""
+        self._state = "structure"
+        if self._is_key:
+            self._stack[-1][1] = text
+        else:
+            self._add(text)
+
+    def _finish_bare(self, end):
+        """Complete an unquoted token ended by ``end``; returns whether ``end`` was consumed"""
+        word = "".join(self._buffer).strip()
+        self._state = "structure"
+        if self._is_key:
+            # A key needs its colon; a stray word before a bracket is dropped
+            if end == ":" and word:
+                self._stack[-1][1] = word.strip("\"'")
+                return True
+            return False
+        if word:
+            self._add(self._scalar(word))
+        return False
+
+    @staticmethod
+    def _scalar(word):
+        literal = word.lower()
+        if literal in _LITERALS:
+            return _LITERALS[literal]
+        if _INTEGER.fullmatch(word):
+            return int(word)
+        if _FLOAT.fullmatch(word):
+            return float(word)
+        return word
+
+def parse_lenient(text):
+    """Parse LLM output in one pass; returns None if it contains no object or array"""
+    parser = LenientJSONParser()
+    parser.feed(text)
+    return parser.close()
@@ -1,19 +1,584 @@
 # core/llm_client.py
 import ollama
+import httpx
 import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import copy
+import hashlib
 import os
 import json
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
 from utils.logging_setup import get_logger
 from utils.config_class import Config
+from core.adaptive_limiter import AdaptiveConcurrencyLimiter
+from core.circuit_breaker import CircuitBreaker
+from core.disk_cache import DiskLRUCache
+from core.output_schemas import validate_json
+from core.lenient_json import LenientJSONParser
 
 logger = get_logger(__name__)
 
+# Rough characters-per-token ratio used to estimate prompt sizes
+CHARS_PER_TOKEN = 4
+
+# Absolute (time.monotonic) deadline for LLM calls made in this context
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+@contextlib.contextmanager
+def llm_deadline(seconds):
+    """Give up on LLM calls made inside this block after ``seconds``
+    
+    Calls still running at the deadline, or started after it, return an
+    error so callers fall back locally. Nested deadlines keep the earliest.
+    The deadline follows the context into tasks created inside the block.
+    """
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class LLMTimeout(Exception):
+    """The server sent nothing for ``LLMClient.timeout`` seconds"""
+
+def _decode_json(text):
+    """Decode the JSON value at the start of ``text``, ignoring anything after it
+
+    A stream stopped early can end with a few characters past the object.
+    """
+    return json.JSONDecoder().raw_decode(text.lstrip())[0]
+
+def truncate_text(text, max_chars):
+    """Cut ``text`` to at most ``max_chars`` characters at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars)]
+    return cut.rsplit(None, 1)[0] if " " in cut else cut
+
 class LLMClient:
-    def __init__(self, model_name=None, timeout=None):
+    # Concurrency windows are shared by every LLMClient instance so the
+    # Ollama server sees one global limit per model
+    _limiters = {}
+    _limiters_lock = threading.Lock()
+    # Likewise one circuit breaker per Ollama server
+    _breakers = {}
+
+    def __init__(self, model_name=None, timeout=None, response_cache=None):
         self.model_name = model_name or Config.LLM_MODEL
         self.timeout = timeout or Config.API_TIMEOUT
-        self.retry_count = 3
-        self.retry_delay = 2
+        self.retry_count = max(1, Config.LLM_RETRY_COUNT)
+        self.retry_delay = Config.LLM_RETRY_BASE_DELAY
+        self.retry_max_delay = Config.LLM_RETRY_MAX_DELAY
+        self.host = self._ollama_host(Config.OLLAMA_URL)
+        # Whether the backend honours a JSON schema as the request format
+        self.structured_output = Config.LLM_STRUCTURED_OUTPUT
+        # One long-lived AsyncClient (and its keep-alive connection pool) per
+        # event loop: httpx connections cannot be shared across loops
+        self._clients = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
+        # Request key -> concurrent.futures.Future of the in-flight call, shared
+        # across threads and event loops (see generate)
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # Per event loop: prompt prefix hash -> lock, see _prefix_lock()
+        self._prefix_locks = weakref.WeakKeyDictionary()
+        # Persistent response cache in front of generate()
+        if response_cache is None and Config.LLM_CACHE_ENABLED:
+            response_cache = DiskLRUCache.shared(
+                Config.LLM_CACHE_PATH,
+                max_bytes=Config.LLM_CACHE_MAX_MB * 1024 * 1024,
+                ttl=Config.LLM_CACHE_TTL
+            )
+        self.response_cache = response_cache or None
+        # Per-task prompt/completion token totals
+        self._token_stats = {}
+        self._token_stats_lock = threading.Lock()
+
+    @staticmethod
+    def _ollama_host(url):
+        """Reduce a configured endpoint URL (e.g. .../api/generate) to the server base URL"""
+        parts = urlsplit(url)
+        if not parts.scheme or not parts.netloc:
+            return url
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _get_client(self):
+        """Return the pooled Ollama client bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(loop)
+                if client is None:
+                    limits = httpx.Limits(
+                        max_connections=Config.LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=Config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY
+                    )
+                    client = ollama.AsyncClient(host=self.host, timeout=self.timeout, limits=limits)
+                    self._clients[loop] = client
+                    logger.debug(f"Created pooled Ollama client for {self.host}")
+        return client
+
+    def _prefix_lock(self, prefix):
+        """Lock that runs calls sharing a prompt prefix back to back
+        
+        Ollama keeps the prefilled prompt of its last request per slot, so
+        calls about the same resume issued one after another only prefill
+        their task-specific tail. Calls for other resumes are not held up.
+        """
+        loop = asyncio.get_running_loop()
+        key = hashlib.sha256(prefix.encode("utf-8")).hexdigest()
+        with self._clients_lock:
+            locks = self._prefix_locks.get(loop)
+            if locks is None:
+                locks = self._prefix_locks[loop] = weakref.WeakValueDictionary()
+            lock = locks.get(key)
+            if lock is None:
+                lock = asyncio.Lock()
+                locks[key] = lock
+        return lock
+
+    def _get_limiter(self, model):
+        """Return the shared adaptive concurrency limiter for a model"""
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            with self._limiters_lock:
+                limiter = self._limiters.get(model)
+                if limiter is None:
+                    limiter = AdaptiveConcurrencyLimiter(
+                        name=model,
+                        initial_limit=Config.LLM_CONCURRENCY_INITIAL,
+                        min_limit=Config.LLM_CONCURRENCY_MIN,
+                        max_limit=Config.LLM_CONCURRENCY_MAX,
+                        latency_tolerance=Config.LLM_LATENCY_TOLERANCE
+                    )
+                    self._limiters[model] = limiter
+        return limiter
+
+    def _get_breaker(self):
+        """Return the shared circuit breaker of this client's Ollama server"""
+        with self._limiters_lock:
+            breaker = self._breakers.get(self.host)
+            if breaker is None:
+                breaker = self._breakers[self.host] = CircuitBreaker(
+                    name=self.host,
+                    failure_threshold=Config.LLM_BREAKER_FAILURES,
+                    reset_timeout=Config.LLM_BREAKER_RESET
+                )
+        return breaker
+
+    def is_available(self):
+        """False while the circuit breaker is open, i.e. calls fail immediately"""
+        return self._get_breaker().state != CircuitBreaker.OPEN
+
+    def get_breaker_stats(self):
+        """State and counters of the circuit breaker"""
+        return self._get_breaker().stats()
+
+    def _backoff(self, attempt):
+        """Delay before retry ``attempt`` (0-based): capped exponential with full jitter"""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_delay * 2 ** attempt))
+
+    def get_limiter_stats(self):
+        """Current window, in-flight count and queue depth for each model"""
+        return {model: limiter.stats() for model, limiter in list(self._limiters.items())}
+
+    async def aclose(self):
+        """Close the pooled client of the running event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        # ollama.AsyncClient keeps its httpx client private
+        http_client = getattr(client, "_client", None)
+        if http_client is not None:
+            await http_client.aclose()
+
+    def _build_options(self, max_tokens=None, temperature=None, top_p=None, stop=None):
+        """Map generation parameters onto Ollama options"""
+        options = {
+            "temperature": Config.DEFAULT_TEMPERATURE if temperature is None else temperature,
+            "top_p": Config.DEFAULT_TOP_P if top_p is None else top_p
+        }
+        if Config.LLM_NUM_CTX:
+            # Must be the same on every request or Ollama reloads the model
+            options["num_ctx"] = Config.LLM_NUM_CTX
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        if stop:
+            options["stop"] = list(stop)
+        return options
+
+    @staticmethod
+    def _cache_key(model, prompt, options, schema=None):
+        """Content address of a request: model, full prompt, sampling parameters and output schema"""
+        request = {"model": model, "prompt": prompt, "options": options}
+        if schema:
+            request["format"] = schema
+        payload = json.dumps(request, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _use_cache(self, options, use_cache):
+        """Decide whether a request may be served from / stored in the cache"""
+        if self.response_cache is None or use_cache is False:
+            return False
+        if use_cache is True:
+            return True
+        # Sampling at higher temperatures is meant to vary between calls
+        return options["temperature"] <= Config.LLM_CACHE_MAX_TEMPERATURE
+
+    def get_cache_stats(self):
+        """Hit/miss counters of the response cache"""
+        return self.response_cache.stats() if self.response_cache else {}
+
+    @staticmethod
+    def estimate_tokens(text):
+        """Approximate token count of ``text``"""
+        return -(-len(text or "") // CHARS_PER_TOKEN)
+
+    @staticmethod
+    def prompt_budget(task=None, max_tokens=None):
+        """Token budget for the prompt of ``task``
+        
+        The task's configured budget (``Config.LLM_TASK_TOKEN_BUDGETS``, else
+        ``Config.LLM_PROMPT_TOKEN_BUDGET``), capped so prompt and completion
+        fit the model context together.
+        """
+        budget = Config.LLM_TASK_TOKEN_BUDGETS.get(task, Config.LLM_PROMPT_TOKEN_BUDGET)
+        context = Config.LLM_NUM_CTX or Config.LLM_CONTEXT_TOKENS
+        return max(1, min(budget, context - (max_tokens or 0)))
+
+    def fit_prompt(self, prompt, task=None, max_tokens=None, document=None, trimmer=None):
+        """Trim ``prompt`` to the task's token budget
+        
+        ``document`` is the variable part of the prompt (e.g. the resume
+        text); when the prompt is over budget it is shrunk with
+        ``trimmer(document, max_chars)``, which should drop the least useful
+        content first, and plain truncation otherwise. As a last resort the
+        middle of the prompt is cut so the instructions at the start and the
+        closing tags at the end survive (Ollama itself would silently drop
+        the start). Returns ``(prompt, trimmed)``.
+        """
+        budget = self.prompt_budget(task, max_tokens)
+        excess = self.estimate_tokens(prompt) - budget
+        if excess <= 0:
+            return prompt, False
+            
+        if document and document in prompt:
+            max_chars = max(0, len(document) - excess * CHARS_PER_TOKEN)
+            shortened = (trimmer or truncate_text)(document, max_chars)
+            prompt = prompt.replace(document, shortened, 1)
+            excess = self.estimate_tokens(prompt) - budget
+            
+        if excess > 0:
+            keep = budget * CHARS_PER_TOKEN
+            tail = min(400, keep // 4)
+            prompt = prompt[:keep - tail] + prompt[-tail:] if tail else prompt[:keep]
+            
+        logger.warning(f"Prompt for task '{task or 'default'}' trimmed to its {budget} token budget")
+        return prompt, True
+
+    def _record_tokens(self, task, prompt_tokens, completion_tokens, trimmed=False, cached=False, prefill_ns=0,
+                       invalid=False, tokens_saved=None, coalesced=False):
+        with self._token_stats_lock:
+            stats = self._token_stats.setdefault(task or "default", {
+                "calls": 0, "cached": 0, "coalesced": 0, "trimmed": 0, "invalid": 0, "early_exits": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "tokens_saved": 0, "prefill_ms": 0.0
+            })
+            stats["calls"] += 1
+            stats["cached"] += int(cached)
+            stats["coalesced"] += int(coalesced)
+            stats["trimmed"] += int(trimmed)
+            stats["invalid"] += int(invalid)
+            if tokens_saved is not None:
+                stats["early_exits"] += 1
+                stats["tokens_saved"] += tokens_saved
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["prefill_ms"] += prefill_ns / 1e6
+
+    def get_token_stats(self):
+        """Per-task call counts, prompt/completion token totals and server prefill time
+        
+        ``tokens_saved`` sums, over streams stopped early, the completion
+        limit minus the tokens generated: an upper bound of the decoding
+        avoided.
+        """
+        with self._token_stats_lock:
+            return {task: dict(stats) for task, stats in self._token_stats.items()}
+
+    def get_coalescing_stats(self):
+        """Requests in flight now and requests that were served by joining one"""
+        with self._inflight_lock:
+            in_flight = len(self._inflight)
+        coalesced = sum(stats["coalesced"] for stats in self.get_token_stats().values())
+        return {"in_flight": in_flight, "coalesced": coalesced}
+
+    @staticmethod
+    def _response_count(response, field):
+        """Token counter reported by Ollama, if any"""
+        try:
+            value = response[field]
+        except (KeyError, TypeError, IndexError):
+            value = getattr(response, field, None)
+        return value if isinstance(value, int) else None
+
+    @staticmethod
+    def _parse_structured(text, schema):
+        """Parse schema-constrained output; returns ``(data, error)``"""
+        try:
+            data = _decode_json(text)
+        except json.JSONDecodeError as e:
+            return None, f"invalid JSON ({e})"
+        errors = validate_json(data, schema)
+        if errors:
+            return None, "; ".join(errors[:3])
+        return data, None
+
+    async def _stream_until_complete(self, request, required=None, timing=None):
+        """Stream a completion, stopping once a JSON object has all ``required`` fields
+        
+        The server gets ``timeout`` seconds for the first token and for each
+        one after it, so long generations are fine as long as they progress;
+        a stalled server raises ``LLMTimeout``. The first chunk is reported
+        to ``timing`` (the limiter's ``CallTiming``). Returns ``(result,
+        final_chunk, chunk_count)``; ``final_chunk`` holds Ollama's counters
+        and is None when the stream was cut short.
+        """
+        final = None
+        stream = None
+        parser = LenientJSONParser() if required else None
+        parts = []
+        chunk_count = 0
+        try:
+            stream = await self._within_timeout(self._get_client().generate(stream=True, **request))
+            while True:
+                try:
+                    chunk = await self._within_timeout(stream.__anext__())
+                except StopAsyncIteration:
+                    break
+                if timing is not None:
+                    timing.first_token_received()
+                text = chunk["response"]
+                if text:
+                    parts.append(text)
+                    chunk_count += 1
+                    # Whatever follows the first complete object is ignored
+                    # by the parsers, so nothing after it is worth waiting for
+                    if parser is not None and not parser.done and parser.feed(text):
+                        root = parser.value
+                        if isinstance(root, dict) and all(field in root for field in required):
+                            return "".join(parts), None, chunk_count
+                if chunk["done"]:
+                    final = chunk
+        finally:
+            # Closing the stream drops the connection, which stops generation
+            close = getattr(stream, "aclose", None)
+            if close is not None:
+                await close()
+        # Ended by the server: a missing final chunk only loses its counters
+        return "".join(parts), final or {}, chunk_count
+
+    async def _within_timeout(self, awaitable):
+        """Await one read from the server, raising ``LLMTimeout`` after ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(awaitable, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise LLMTimeout(f"No response from the LLM server for {self.timeout}s") from None
+
+    async def generate(self, prompt, max_tokens=None, temperature=None, top_p=None, stop=None, model=None,
+                       use_cache=None, task=None, document=None, trimmer=None, prefix=None, schema=None):
+        """Generate a completion for a raw prompt
+        
+        Returns ``{"status": "success"|"error", "result": str, "error": str|None}``
+        and never raises for API failures, so callers can fall back locally.
+        Responses are cached unless ``use_cache`` is False; by default only
+        requests at or below ``Config.LLM_CACHE_MAX_TEMPERATURE`` are cached.
+        ``task`` selects the prompt token budget and the metrics bucket;
+        ``document`` and ``trimmer`` control how an oversized prompt is cut
+        (see ``fit_prompt``). Calls passing the same ``prefix`` (the shared
+        leading block of their prompts) are run one at a time so the server
+        can reuse its prompt cache.
+        
+        With a JSON ``schema`` and a backend supporting structured output,
+        decoding is constrained to the schema and the parsed, validated
+        object is returned as ``data``. Output that still fails validation
+        comes back with ``data`` None and the reason in ``schema_error``,
+        so callers parse and repair ``result`` as they would without
+        structured output, where the schema is ignored. Either way a schema's required
+        fields let the response be streamed and cut off as soon as a JSON
+        object containing them is complete.
+        
+        Identical requests (model, prompt, options and schema) made while
+        one is in flight, from any thread or event loop, wait for that call
+        and get a copy of its response instead of reaching Ollama.
+        """
+        model = model or self.model_name
+        options = self._build_options(max_tokens, temperature, top_p, stop)
+        prompt, trimmed = self.fit_prompt(prompt, task, max_tokens, document, trimmer)
+        if prefix and not prompt.startswith(prefix):
+            # Trimming reached into the prefix, so no other call shares it
+            prefix = None
+        required = (schema or {}).get("required") if Config.LLM_STREAM_EARLY_EXIT else None
+        schema = schema if self.structured_output else None
+        
+        cache_key = None
+        if self._use_cache(options, use_cache):
+            cache_key = self._cache_key(model, prompt, options, schema)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"LLM cache hit {cache_key[:12]}")
+                self._record_tokens(task, 0, 0, trimmed, cached=True)
+                response = {"status": "success", "result": cached["result"], "error": None, "cached": True}
+                if schema:
+                    # Only valid output is ever stored
+                    response["data"] = _decode_json(cached["result"])
+                return response
+                
+        if not Config.LLM_COALESCE_REQUESTS:
+            return await self._call(model, prompt, options, schema, required, task, trimmed, prefix, cache_key)
+        
+        # Identical requests already in flight share their result
+        key = cache_key or self._cache_key(model, prompt, options, schema)
+        while True:
+            with self._inflight_lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._inflight[key] = concurrent.futures.Future()
+            if leader:
+                break
+            try:
+                # Shielded: a follower giving up must not cancel the shared call
+                response = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    # The leader was cancelled; try to lead or join again
+                    continue
+                raise
+            self._record_tokens(task, 0, 0, trimmed, coalesced=True)
+            logger.debug(f"Coalesced identical in-flight LLM request {key[:12]}")
+            return dict(copy.deepcopy(response), coalesced=True)
+        
+        try:
+            response = await self._call(model, prompt, options, schema, required, task, trimmed, prefix, cache_key)
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(copy.deepcopy(response))
+            return response
+        finally:
+            with self._inflight_lock:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+    async def _request(self, request, required, prefix, sent):
+        """One attempt: wait for the prompt prefix and a limiter slot, then call Ollama
+        
+        Returns ``(result, response, chunk_count)`` like ``_stream_until_complete``;
+        ``sent`` is set once the request has actually gone to the server.
+        The server timeout only starts then, so queueing never counts.
+        """
+        # Waiting for a shared prefix does not hold a limiter slot
+        async with self._prefix_lock(prefix) if prefix else contextlib.nullcontext():
+            async with self._get_limiter(request["model"]).slot() as timing:
+                sent.set()
+                return await self._stream_until_complete(request, required, timing)
+
+    async def _call(self, model, prompt, options, schema, required, task, trimmed, prefix, cache_key):
+        """Send a request to Ollama, retrying failures; see ``generate``
+        
+        Retries back off exponentially with jitter. Server errors and
+        stalls (see ``_stream_until_complete``) feed the server's circuit
+        breaker; while it is open the call fails at once, so callers use
+        their local fallbacks without waiting. An enclosing ``llm_deadline``
+        bounds the whole call, queueing included, but running out of it is
+        the caller's limit, not a server failure.
+        """
+        request = {
+            "model": model,
+            "prompt": prompt,
+            "options": options,
+            "format": schema or "",
+            "keep_alive": Config.LLM_KEEP_ALIVE or None
+        }
+        breaker = self._get_breaker()
+        deadline = _deadline.get()
+        last_error = None
+        
+        for attempt in range(self.retry_count):
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                last_error = f"Deadline exceeded (last error: {last_error})" if last_error else "Deadline exceeded"
+                break
+            if not breaker.allow():
+                logger.debug(f"Circuit open, skipping {task or 'LLM'} request")
+                return {"status": "error", "result": "", "error": "LLM unavailable (circuit open)", "short_circuited": True}
+                
+            sent = asyncio.Event()
+            try:
+                result, response, chunk_count = await asyncio.wait_for(
+                    self._request(request, required, prefix, sent), timeout=remaining
+                )
+            except asyncio.TimeoutError:
+                # The caller's deadline, which may have expired in the queue
+                last_error = "Deadline exceeded"
+                logger.warning(f"{task or 'LLM'} request abandoned at the caller's deadline")
+                break
+            except Exception as e:
+                last_error = str(e) or type(e).__name__
+                logger.error(f"Generate attempt {attempt+1} failed: {last_error}")
+                if sent.is_set():
+                    breaker.record_failure()
+                if attempt < self.retry_count - 1:
+                    delay = self._backoff(attempt)
+                    if deadline is not None and time.monotonic() + delay >= deadline:
+                        break
+                    # Retry delays are spent outside the limiter slot
+                    await asyncio.sleep(delay)
+                continue
+            breaker.record_success()
+            
+            tokens_saved = None
+            if required and response is None:
+                # Cut short: no counters from Ollama, one chunk per token
+                response = {"eval_count": chunk_count}
+                tokens_saved = max(0, options.get("num_predict", chunk_count) - chunk_count)
+                logger.debug(f"Stopped {task or 'LLM'} stream after {chunk_count} tokens")
+            data, error = self._parse_structured(result, schema) if schema else (None, None)
+            # Ollama reports exact counts; estimate when it does not.
+            # prompt_eval_count only covers tokens not served from its prefix cache
+            prompt_tokens = self._response_count(response, "prompt_eval_count")
+            completion_tokens = self._response_count(response, "eval_count")
+            self._record_tokens(
+                task,
+                self.estimate_tokens(prompt) if prompt_tokens is None else prompt_tokens,
+                self.estimate_tokens(result) if completion_tokens is None else completion_tokens,
+                trimmed,
+                prefill_ns=self._response_count(response, "prompt_eval_duration") or 0,
+                invalid=bool(schema and error),
+                tokens_saved=tokens_saved
+            )
+            if schema and error:
+                # Constrained decoding is deterministic enough that a retry
+                # would fail the same way; the caller parses and repairs the
+                # text like any unstructured response. Not cached.
+                logger.warning(f"{task or 'LLM'} response does not match its schema: {error}")
+                return {"status": "success", "result": result, "error": None, "data": None, "schema_error": error}
+            if cache_key and result.strip():
+                self.response_cache.set(cache_key, {"result": result, "model": model})
+            if schema:
+                return {"status": "success", "result": result, "error": None, "data": data}
+            return {"status": "success", "result": result, "error": None}
+                    
+        return {"status": "error", "result": "", "error": last_error}
 
     async def evaluate_resume(self, resume_data, criteria_items, job_description):
         """Complete fixed evaluation pipeline"""
@@ -70,13 +635,24 @@ class LLMClient:
 
     async def _get_llm_response(self, prompt):
         """Fixed async LLM call with better error handling"""
+        breaker = self._get_breaker()
+        deadline = _deadline.get()
         for attempt in range(self.retry_count):
+            if deadline is not None and deadline <= time.monotonic():
+                break
+            if not breaker.allow():
+                raise Exception("LLM unavailable (circuit open)")
             try:
-                response = await ollama.AsyncClient().chat(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    options={'temperature': 0.3}
-                )
+                async with self._get_limiter(self.model_name).slot():
+                    # The timeout starts once the request is sent
+                    response = await self._within_timeout(
+                        self._get_client().chat(
+                            model=self.model_name,
+                            messages=[{"role": "user", "content": prompt}],
+                            options={'temperature': 0.3}
+                        )
+                    )
+                breaker.record_success()
                 content = response['message']['content']
                 
                 if not content.strip():
@@ -84,10 +660,16 @@ class LLMClient:
                     
                 return content
                 
-            except Exception as e:
+            except ValueError as e:
                 logger.error(f"Attempt {attempt+1} failed: {str(e)}")
-                if attempt < self.retry_count - 1:
-                    await asyncio.sleep(self.retry_delay)
+            except Exception as e:
+                breaker.record_failure()
+                logger.error(f"Attempt {attempt+1} failed: {str(e) or type(e).__name__}")
+            if attempt < self.retry_count - 1:
+                delay = self._backoff(attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    break
+                await asyncio.sleep(delay)
         raise Exception("All retry attempts failed")
 
     def _create_structured_prompt(self, resume_data, criteria_items, job_description):
@@ -0,0 +1,106 @@
+# core/output_schemas.py
+"""JSON schemas of the structured LLM tasks
+
+Sent to Ollama as the ``format`` of a request, which constrains decoding to
+JSON matching the schema, and used to validate the response. Value ranges
+(scores, list lengths) are left to the analyzers, which clamp them.
+"""
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+TASK_SCHEMAS = {
+    "summary": {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "email": {"type": "string"},
+            "phone": {"type": "string"},
+            "years_experience": {"type": ["number", "string"]},
+            "education": {"type": "string"},
+            "top_skills": _STRING_LIST,
+            "last_position": {"type": "string"}
+        },
+        "required": ["name", "email", "phone", "years_experience", "education", "top_skills", "last_position"]
+    },
+    "skill_match": {
+        "type": "object",
+        "properties": {
+            "match_score": {"type": "integer"},
+            "matching_skills": _STRING_LIST,
+            "missing_skills": _STRING_LIST
+        },
+        "required": ["match_score", "matching_skills", "missing_skills"]
+    },
+    "recommendation": {
+        "type": "object",
+        "properties": {
+            "overall_rating": {"type": "integer"},
+            "strengths": _STRING_LIST,
+            "concerns": _STRING_LIST,
+            "interview_questions": _STRING_LIST,
+            "recommendation": {
+                "type": "string",
+                "enum": ["Highly Recommend", "Recommend", "Consider", "Not Recommended"]
+            }
+        },
+        "required": ["overall_rating", "strengths", "concerns", "interview_questions", "recommendation"]
+    }
+}
+
+def criteria_schema(count):
+    """Schema of a combined criteria verdict mapping criterion numbers to ✅ or ❌"""
+    keys = [str(i) for i in range(1, count + 1)]
+    return {
+        "type": "object",
+        "properties": {key: {"type": "string", "enum": ["✅", "❌"]} for key in keys},
+        "required": keys
+    }
+
+# Completion limits for schema-constrained output, which has no preamble or
+# trailing chatter; free-form output keeps the 1024 token headroom
+TASK_MAX_TOKENS = {
+    "summary": 384,
+    "skill_match": 256,
+    "recommendation": 640
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "null": type(None)
+}
+
+def _is_type(value, name):
+    if isinstance(value, bool) and name in ("number", "integer"):
+        return False
+    return isinstance(value, _TYPES[name])
+
+def validate_json(data, schema, path="$"):
+    """List the ways ``data`` violates ``schema`` (empty when it conforms)
+
+    Covers the subset of JSON Schema used in ``TASK_SCHEMAS``: ``type``,
+    ``properties``, ``required``, ``items`` and ``enum``.
+    """
+    errors = []
+    types = schema.get("type")
+    if types is not None:
+        types = [types] if isinstance(types, str) else types
+        if not any(_is_type(data, name) for name in types):
+            return [f"{path}: expected {' or '.join(types)}, got {type(data).__name__}"]
+    if "enum" in schema and data not in schema["enum"]:
+        errors.append(f"{path}: {data!r} is not one of {schema['enum']}")
+    if isinstance(data, dict):
+        for field in schema.get("required", ()):
+            if field not in data:
+                errors.append(f"{path}: missing required field '{field}'")
+        for field, subschema in schema.get("properties", {}).items():
+            if field in data:
+                errors.extend(validate_json(data[field], subschema, f"{path}.{field}"))
+    if isinstance(data, list) and "items" in schema:
+        for i, item in enumerate(data):
+            errors.extend(validate_json(item, schema["items"], f"{path}[{i}]"))
+    return errors
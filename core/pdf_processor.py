@@ -1,19 +1,131 @@
 import re
 import os
+import time
+import hashlib
+import asyncio
+import threading
+import multiprocessing
+import concurrent.futures
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import PyPDF2
 from PyPDF2 import PdfReader
 from utils.logging_setup import get_logger
 logger = get_logger(__name__)  # Create logger instance
 from utils.config import Config
+from core.disk_cache import DiskLRUCache
+
+# Bump when extraction or cleanup output changes so cached text is not reused
+EXTRACTOR_VERSION = f"pypdf2-{getattr(PyPDF2, '__version__', 'unknown')}/1"
+
+# Workers must not be forked from this multithreaded process (a lock held
+# by another thread at fork time stays locked in the child forever)
+_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# Set in each worker process: where it reports the files it starts on
+_started_queue = None
+
+def _init_worker(started_queue):
+    global _started_queue
+    _started_queue = started_queue
+
+def _extract_in_worker(path, use_advanced_cleanup, token=None):
+    """Process pool entry point: extract one PDF by path (bypasses the text cache)"""
+    if _started_queue is not None and token is not None:
+        _started_queue.put(token)
+    return PDFProcessor(use_advanced_cleanup=use_advanced_cleanup, text_cache=False)._extract_record(path)
+
+def _file_path(file):
+    """Path of an uploaded file object or path, or None for in-memory streams"""
+    if isinstance(file, (str, os.PathLike)):
+        return os.fspath(file)
+    name = getattr(file, "name", None)
+    return name if isinstance(name, str) and os.path.exists(name) else None
+
+class _WorkerPool:
+    """A process pool plus the queue its workers announce started files on"""
+
+    def __init__(self, size):
+        self.size = size
+        self.started = _MP_CONTEXT.SimpleQueue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=size, mp_context=_MP_CONTEXT, initializer=_init_worker, initargs=(self.started,)
+        )
+
+    def drain_started(self):
+        """Tokens of the files workers have started on since the last call"""
+        tokens = []
+        while not self.started.empty():
+            tokens.append(self.started.get())
+        return tokens
 
 class PDFProcessor:
     """Enhanced PDF text extraction with multiple fallback methods"""
     
-    def __init__(self, use_advanced_cleanup=None):
+    def __init__(self, use_advanced_cleanup=None, text_cache=None):
         # Default to using Config setting for advanced cleanup
         self.use_advanced_cleanup = use_advanced_cleanup if use_advanced_cleanup is not None else Config.USE_ADVANCED_CLEANUP
+        # Extracted-text cache keyed by file content; pass False to disable
+        if text_cache is None and Config.PDF_CACHE_ENABLED:
+            text_cache = DiskLRUCache.shared(Config.PDF_CACHE_PATH, max_bytes=Config.PDF_CACHE_MAX_MB * 1024 * 1024)
+        self.text_cache = text_cache or None
+        # Idle worker pools kept for later extract_texts calls, see _checkout_pool()
+        self._idle_pools = []
+        self._pool_lock = threading.Lock()
         
     def extract_text(self, file):
         """Extract text with fallbacks if primary method fails"""
+        return self.extract_record(file)["text"]
+        
+    def extract_record(self, file):
+        """Extract ``{"text", "page_count", "method"}``, reusing cached text for identical files"""
+        cache_key = self._cache_key(file)
+        if cache_key:
+            cached = self.text_cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Extracted text cache hit for {_file_path(file) or 'upload'}")
+                return cached
+                
+        record = self._extract_record(file)
+        self._store_record(cache_key, record)
+        return record
+        
+    def _cache_key(self, file):
+        """SHA-256 of the file bytes plus everything that affects the extracted text"""
+        if self.text_cache is None:
+            return None
+        try:
+            digest = hashlib.sha256()
+            path = _file_path(file)
+            if path:
+                with open(path, "rb") as handle:
+                    for block in iter(lambda: handle.read(1 << 20), b""):
+                        digest.update(block)
+            elif hasattr(file, "read") and hasattr(file, "seek"):
+                position = file.tell()
+                digest.update(file.read())
+                file.seek(position)
+            else:
+                return None
+        except Exception as e:
+            logger.warning(f"Could not hash file for text cache: {str(e)}")
+            return None
+        return f"{digest.hexdigest()}:{EXTRACTOR_VERSION}:cleanup={int(bool(self.use_advanced_cleanup))}"
+        
+    def _store_record(self, cache_key, record):
+        # Failures may be transient, so only successful extractions are kept
+        if cache_key and record["method"] != "failed":
+            self.text_cache.set(cache_key, record)
+            
+    def get_cache_stats(self):
+        """Hit/miss counters of the extracted-text cache"""
+        return self.text_cache.stats() if self.text_cache else {}
+        
+    def _extract_record(self, file):
+        """Extract text, page count and the method that produced the text"""
         try:
             # Primary extraction using PyPDF2
             reader = PdfReader(file)
@@ -23,11 +135,252 @@ class PDFProcessor:
             if self.use_advanced_cleanup:
                 text = self._cleanup_text(text)
                 
-            return text.encode('utf-8', 'replace').decode('utf-8') if text else ""
+            text = text.encode('utf-8', 'replace').decode('utf-8') if text else ""
+            return {"text": text, "page_count": len(reader.pages), "method": "pypdf2"}
         except Exception as primary_error:
             logger.warning(f"Primary PDF extraction failed: {str(primary_error)}")
             return self._fallback_extraction(file)
     
+    def extract_texts(self, files, max_workers=None, timeout=None):
+        """Extract many PDFs across a process pool, yielding results as they complete
+        
+        Yields ``{"index", "file", "text", "page_count", "method", "error"}``
+        dicts, where ``index`` is the position in ``files``. ``files`` may be
+        any iterable; it is consumed lazily, only as fast as the pool (and the
+        consumer of this generator) can take files, so very large batches are
+        never held in memory. Cached files are yielded without touching the
+        pool. Each file gets ``timeout`` seconds (``Config.PDF_EXTRACT_TIMEOUT``)
+        from the moment a worker starts on it; a hung or crashing file is
+        reported as an error without failing the others. Files caught in a
+        crashed pool are re-run one at a time so the culprit can be
+        identified. Each call has a pool of its own, so killing it never
+        touches another call's work; pools are kept for later calls.
+        """
+        max_workers = max(1, max_workers or Config.PDF_WORKERS or os.cpu_count() or 1)
+        if hasattr(files, "__len__"):
+            max_workers = max(1, min(max_workers, len(files)))
+        if timeout is None:
+            timeout = Config.PDF_EXTRACT_TIMEOUT
+            
+        source = enumerate(files)
+        exhausted = False
+        tracked = {}  # index -> (file, cache_key) until its result is yielded
+        pending = deque()
+        suspects = deque()
+        running = {}  # future -> (index, isolated)
+        started = {}  # index -> when a worker was seen starting on it
+        pool = None
+        
+        def submit(index, isolated):
+            try:
+                future = pool.executor.submit(
+                    _extract_in_worker, _file_path(tracked[index][0]), self.use_advanced_cleanup, index
+                )
+            except BrokenProcessPool:
+                # A worker died since the last wait; its futures report it
+                (suspects if isolated else pending).appendleft(index)
+                return False
+            running[future] = (index, isolated)
+            return True
+            
+        def discard_pool():
+            nonlocal pool
+            self._terminate_pool(pool.executor)
+            pool = None
+            started.clear()
+            
+        def report(index, record=None, error=None):
+            file, _ = tracked.pop(index)
+            return self._result(index, file, record=record, error=error)
+            
+        try:
+            while True:
+                # Pull more files only when the pool has room for them
+                while not exhausted and len(pending) + len(running) < max_workers:
+                    try:
+                        index, file = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if _file_path(file) is None:
+                        # In-memory uploads cannot be sent to a worker process
+                        yield self._result(index, file, record=self.extract_record(file))
+                        continue
+                    cache_key = self._cache_key(file)
+                    cached = self.text_cache.get(cache_key) if cache_key else None
+                    if cached is not None:
+                        yield self._result(index, file, record=cached)
+                        continue
+                    tracked[index] = (file, cache_key)
+                    pending.append(index)
+                    
+                if not (pending or suspects or running):
+                    break
+                if pool is None:
+                    pool = self._checkout_pool(max_workers)
+                    
+                isolating = any(isolated for _, isolated in running.values())
+                while pending and len(running) < max_workers and not isolating:
+                    if not submit(pending.popleft(), False):
+                        break
+                if suspects and not running:
+                    submit(suspects.popleft(), True)
+                if not running:
+                    # The pool broke with nothing left in flight; start afresh
+                    discard_pool()
+                    continue
+                    
+                done, _ = wait(list(running), timeout=0.5, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                for index in pool.drain_started():
+                    started.setdefault(index, now)
+                broken = False
+                for future in done:
+                    index, isolated = running.pop(future)
+                    started.pop(index, None)
+                    try:
+                        record = future.result()
+                        self._store_record(tracked[index][1], record)
+                        yield report(index, record=record)
+                    except BrokenProcessPool:
+                        broken = True
+                        if isolated:
+                            logger.error(f"PDF worker crashed on {_file_path(tracked[index][0])}")
+                            yield report(index, error="Extraction worker crashed")
+                        else:
+                            suspects.append(index)
+                    except Exception as e:
+                        yield report(index, error=str(e))
+                        
+                if broken:
+                    # The whole pool is unusable; everything still in flight is a suspect
+                    suspects.extend(index for index, _ in running.values())
+                    running.clear()
+                    discard_pool()
+                    continue
+                    
+                if timeout:
+                    expired = [
+                        future for future, (index, _) in running.items()
+                        if index in started and now - started[index] > timeout
+                    ]
+                    if expired:
+                        for future in expired:
+                            index, _ = running.pop(future)
+                            logger.error(f"PDF extraction timed out after {timeout}s: {_file_path(tracked[index][0])}")
+                            yield report(index, error=f"Extraction timed out after {timeout}s")
+                        # Hung workers can only be reclaimed by killing the pool;
+                        # the other in-flight files are innocent and go first again
+                        pending.extendleft(reversed([index for index, _ in running.values()]))
+                        running.clear()
+                        discard_pool()
+        finally:
+            if pool is not None:
+                if running:
+                    # Abandoned mid-batch: files still parsing would hold up the next call
+                    self._terminate_pool(pool.executor)
+                else:
+                    self._return_pool(pool)
+                    
+    def _checkout_pool(self, max_workers):
+        """An idle pool with room for ``max_workers``, or a new one"""
+        with self._pool_lock:
+            for i, pool in enumerate(self._idle_pools):
+                if pool.size >= max_workers:
+                    del self._idle_pools[i]
+                    # Start reports of the previous call's last files
+                    pool.drain_started()
+                    return pool
+        return _WorkerPool(max_workers)
+        
+    def _return_pool(self, pool):
+        with self._pool_lock:
+            self._idle_pools.append(pool)
+            
+    def close(self):
+        """Shut down the idle worker pools"""
+        with self._pool_lock:
+            pools, self._idle_pools = self._idle_pools, []
+        for pool in pools:
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+                
+    async def extract_texts_async(self, files, max_workers=None, timeout=None, max_buffered=None):
+        """Async generator over ``extract_texts`` that keeps the event loop free
+        
+        At most ``max_buffered`` results wait for the consumer; beyond that
+        extraction pauses, so a slow consumer bounds memory use.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=max_buffered or 0)
+        finished = object()
+        stop = threading.Event()
+        
+        def publish(item):
+            try:
+                future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            except RuntimeError:
+                stop.set()  # The consuming loop has gone away
+                return
+            while not stop.is_set():
+                try:
+                    future.result(timeout=0.2)
+                    return
+                except concurrent.futures.TimeoutError:
+                    continue
+                except Exception:
+                    break
+            future.cancel()
+            stop.set()
+                
+        def produce():
+            try:
+                for item in self.extract_texts(files, max_workers, timeout):
+                    publish(item)
+                    if stop.is_set():
+                        break
+            except Exception as e:
+                publish(e)
+            finally:
+                publish(finished)
+                
+        threading.Thread(target=produce, name="pdf-extraction", daemon=True).start()
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            # Release a producer blocked on a full queue
+            while not queue.empty():
+                queue.get_nowait()
+            
+    @staticmethod
+    def _result(index, file, record=None, error=None):
+        record = record or {}
+        return {
+            "index": index,
+            "file": file,
+            "text": record.get("text") or "",
+            "page_count": record.get("page_count", 0),
+            "method": record.get("method", "failed"),
+            "error": error
+        }
+        
+    @staticmethod
+    def _terminate_pool(executor):
+        """Kill a process pool's workers, including hung ones"""
+        # ProcessPoolExecutor offers no public way to stop a running task
+        for process in list(getattr(executor, "_processes", {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+    
     def _cleanup_text(self, text):
         """Apply advanced text cleanup"""
         if not text:
@@ -67,10 +420,10 @@ class PDFProcessor:
             
             if combined_text:
                 logger.info("Successfully used fallback extraction")
-                return combined_text
+                return {"text": combined_text, "page_count": len(reader.pages), "method": "pypdf2_fallback"}
             else:
                 logger.warning("Fallback extraction failed to get text")
-                return "No readable text found in document"
+                return {"text": "No readable text found in document", "page_count": len(reader.pages), "method": "pypdf2_fallback"}
         except Exception as fallback_error:
             logger.error(f"All PDF extraction methods failed: {str(fallback_error)}")
-            return f"Error extracting text: {str(fallback_error)}"
+            return {"text": f"Error extracting text: {str(fallback_error)}", "page_count": 0, "method": "failed"}
@@ -1,7 +1,6 @@
 import gradio as gr
 import threading
 import argparse
-from utils.resume_batch import ResumeBatch  # Import the newly created ResumeBatch class
 from utils.config_class import Config  # Import Config class
 from ui.gradio_app import GradioApp  # Correct import path based on your folder structure
 from core.pdf_processor import PDFProcessor
@@ -14,24 +13,6 @@ from utils.logging_setup import get_logger
 # Set up logger
 logger = get_logger(__name__)
 
-# Instantiate the components
-pdf_processor = PDFProcessor()  # Create an instance of PDFProcessor
-llm_client = LLMClient()        # Create an instance of LLMClient
-json_handler = JSONHandler()    # Create an instance of JSONHandler
-report_generator = ReportGenerator(template_dir=Config.TEMPLATE_DIR)  # Create an instance of ReportGenerator
-
-# Pass the initialized components to ResumeBatch
-batch = ResumeBatch(pdf_processor=pdf_processor, llm_client=llm_client, json_handler=json_handler)
-
-# Create the GradioApp instance
-gradio_app = GradioApp(pdf_processor, llm_client, json_handler, report_generator)
-
-# Build the Gradio UI
-demo = gradio_app.build_ui()
-
-# Now call demo.launch() directly to start the Gradio app
-demo.launch(server_port=8080, share=True)  # Adjust the port and share options as required
-
 # Define a function to create the app components
 def create_app():
     # Initialize core components
@@ -0,0 +1,45 @@
+from core.lenient_json import LenientJSONParser, parse_lenient
+
+
+def test_prose_and_code_fence_around_object():
+    text = 'Sure! Here is the analysis:\n```json\n{"match_score": 72, "skills": ["Python",],}\n```\nAnything else?'
+    assert parse_lenient(text) == {"match_score": 72, "skills": ["Python"]}
+
+
+def test_bracketed_prose_before_object():
+    text = 'Here is the analysis [JSON]:\n{"filename": "cv.pdf", "score": 3}'
+    assert parse_lenient(text) == {"filename": "cv.pdf", "score": 3}
+
+
+def test_array_root_without_object():
+    assert parse_lenient('Skills: ["Python", "SQL"]') == ["Python", "SQL"]
+    assert parse_lenient('[{"a": 1}, {"b": 2}]') == [{"a": 1}, {"b": 2}]
+
+
+def test_missing_commas():
+    assert parse_lenient('{"a": 1, "b": 2 "c": 3}') == {"a": 1, "b": 2, "c": 3}
+    assert parse_lenient('{"a": "x" "b": 2}') == {"a": "x", "b": 2}
+    assert parse_lenient("{'a': 1 'b': 2}") == {"a": 1, "b": 2}
+    assert parse_lenient('{"a": 1\n"b": 2}') == {"a": 1, "b": 2}
+
+
+def test_unquoted_keys_and_quotes_inside_strings():
+    assert parse_lenient("{name: O'Brien, rating: 7}") == {"name": "O'Brien", "rating": 7}
+    assert parse_lenient('{"q": "the "best" one", "r": \'it\'s\'}') == {"q": 'the "best" one', "r": "it's"}
+
+
+def test_truncated_tail_is_closed():
+    parser = LenientJSONParser()
+    parser.feed('{"overall_rating": 7, "concerns": ["Short tenures", "No manage')
+    assert parser.close() == {"overall_rating": 7, "concerns": ["Short tenures", "No manage"]}
+    assert parser.truncated
+
+
+def test_feed_reports_completion_across_chunks():
+    parser = LenientJSONParser()
+    assert [parser.feed(chunk) for chunk in ['Here [JS', 'ON]: {"a"', ": 1}"]] == [False, False, True]
+    assert parser.value == {"a": 1}
+
+
+def test_no_json():
+    assert parse_lenient("I could not analyse this resume.") is None
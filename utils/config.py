@@ -16,6 +16,36 @@ class Config:
     DEFAULT_TEMPERATURE = float(os.getenv("DEFAULT_TEMPERATURE", "0.1"))
     DEFAULT_TOP_P = float(os.getenv("DEFAULT_TOP_P", "0.3"))
     
+    # Batch Processing Settings
+    MAX_CONCURRENT_RESUMES = int(os.getenv("MAX_CONCURRENT_RESUMES", "4"))
+    RESUME_TIMEOUT = int(os.getenv("RESUME_TIMEOUT", "600"))  # Seconds per resume, 0 disables
+    BATCH_TIMEOUT = int(os.getenv("BATCH_TIMEOUT", "0"))  # Seconds of LLM use per batch, then local fallbacks; 0 disables
+    LOCAL_CRITERIA_MATCHING = os.getenv("LOCAL_CRITERIA_MATCHING", "True").lower() == "true"  # Literal criteria skip the LLM
+    CRITERIA_MODE = os.getenv("CRITERIA_MODE", "per_criterion")  # "per_criterion" or "combined"
+    CRITERIA_BATCH_SIZE = int(os.getenv("CRITERIA_BATCH_SIZE", "20"))  # Max criteria per combined prompt
+    CASCADE_TOP_K = int(os.getenv("CASCADE_TOP_K", "0"))  # Deep LLM analysis only for the best K resumes, 0 = everyone
+    CASCADE_MIN_SCORE = float(os.getenv("CASCADE_MIN_SCORE", "0"))  # ...plus any resume scoring at least this locally, 0 = off
+    PROMPT_LAYOUT = os.getenv("PROMPT_LAYOUT", "task_first")  # "task_first" or "shared_prefix" (resume first, reuses Ollama's prefix cache)
+    SECTION_TRIMMING = os.getenv("SECTION_TRIMMING", "True").lower() == "true"  # Send each stage only the resume sections it needs
+    JOB_DIGEST_MIN_TOKENS = int(os.getenv("JOB_DIGEST_MIN_TOKENS", "400"))  # Longer job descriptions are condensed in prompts
+    JOB_DIGEST_MAX_CHARS = int(os.getenv("JOB_DIGEST_MAX_CHARS", "1500"))
+    CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "True").lower() == "true"  # Resume interrupted batches
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "cache/checkpoints.sqlite")
+    CHECKPOINT_MAX_MB = int(os.getenv("CHECKPOINT_MAX_MB", "256"))
+    CHECKPOINT_TTL = int(os.getenv("CHECKPOINT_TTL", str(7 * 24 * 3600)))  # Seconds, 0 keeps checkpoints forever
+    
+    # PDF Extraction Settings
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0"))  # Extraction processes, 0 = one per CPU core
+    PDF_EXTRACT_TIMEOUT = int(os.getenv("PDF_EXTRACT_TIMEOUT", "60"))  # Seconds per file, 0 disables
+    PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "True").lower() == "true"
+    PDF_CACHE_PATH = os.getenv("PDF_CACHE_PATH", "cache/extracted_text.sqlite")
+    PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "512"))
+    
+    # Background Job Settings
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Concurrent analysis jobs
+    JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", "100"))  # Finished jobs kept for polling
+    STREAM_PROGRESS_INTERVAL = float(os.getenv("STREAM_PROGRESS_INTERVAL", "5"))  # Seconds between idle progress events
+    
     # Application Settings
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -35,6 +65,7 @@ class Config:
     # Path Settings
     TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "ui/templates")
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", "output")
+    SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "analysis/data/skill_taxonomy.json")
     
     @classmethod
     def get_prompt_template(cls, template_name):
@@ -15,7 +15,35 @@ class Config:
     
     # API Settings
     OLLAMA_URL = os.getenv("OLLAMA_URL", "http://127.0.0.1:11434/api/generate")
-    API_TIMEOUT = int(os.getenv("API_TIMEOUT", "45"))
+    API_TIMEOUT = int(os.getenv("API_TIMEOUT", "45"))  # Seconds to wait for the first token, then between tokens
+    LLM_RETRY_COUNT = int(os.getenv("LLM_RETRY_COUNT", "3"))
+    LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))  # Seconds; doubles per attempt, with full jitter
+    LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # Consecutive failures that open the circuit
+    LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))  # Seconds before a probe call is let through
+    LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "16"))
+    LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))  # Seconds an idle connection is kept
+    LLM_KEEP_ALIVE = os.getenv("LLM_KEEP_ALIVE", "10m")  # How long Ollama keeps the model (and its prompt cache) loaded; empty = server default
+    
+    # Adaptive LLM concurrency (AIMD window per model)
+    LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "4"))
+    LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+    LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "32"))
+    LLM_LATENCY_TOLERANCE = float(os.getenv("LLM_LATENCY_TOLERANCE", "2.0"))  # Short/long-term latency ratio that halves the window
+    
+    # LLM response cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_responses.sqlite")
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # Seconds, 0 disables expiry
+    LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))  # Hotter requests bypass the cache
+    LLM_COALESCE_REQUESTS = os.getenv("LLM_COALESCE_REQUESTS", "True").lower() == "true"  # Share identical in-flight requests
+    
+    # Schema-constrained JSON output (Ollama "format"); disable for backends without it
+    LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "True").lower() == "true"
+    # Stream JSON tasks and stop once the object with its required fields is complete
+    LLM_STREAM_EARLY_EXIT = os.getenv("LLM_STREAM_EARLY_EXIT", "True").lower() == "true"
     
     # LLM Model Settings
     LLM_MODEL = os.getenv("LLM_MODEL", "mistral:latest")  # Added LLM_MODEL here
@@ -23,6 +51,23 @@ class Config:
     DEFAULT_TEMPERATURE = float(os.getenv("DEFAULT_TEMPERATURE", "0.1"))
     DEFAULT_TOP_P = float(os.getenv("DEFAULT_TOP_P", "0.3"))
     
+    # Prompt token budgets
+    LLM_CONTEXT_TOKENS = int(os.getenv("LLM_CONTEXT_TOKENS", "8192"))
+    # Sent to Ollama as num_ctx so prompts are not cut to the server default;
+    # 0 keeps the server default, which LLM_CONTEXT_TOKENS must then match
+    LLM_NUM_CTX = int(os.getenv("LLM_NUM_CTX", str(LLM_CONTEXT_TOKENS)))
+    LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6144"))  # Tasks without their own budget
+    LLM_TASK_TOKEN_BUDGETS = {
+        task.strip(): int(budget)
+        for task, budget in (
+            item.split("=", 1)
+            for item in os.getenv(
+                "LLM_TASK_TOKEN_BUDGETS", "criteria=4096,summary=3072,skill_match=3072,recommendation=4096"
+            ).split(",")
+            if "=" in item
+        )
+    }
+    
     # Application Settings
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")